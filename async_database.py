@@ -0,0 +1,91 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, List, Optional, Tuple, TypeVar
+from models import Billionaire, Vote, Report
+from database_models import BillionaireModel, BillionaireRankingModel, VoteModel, ReportModel, RankingSnapshotModel
+from database import Database, RANKING_SNAPSHOT_ID, ranking_keyset_filter
+
+T = TypeVar("T")
+
+class AsyncDatabase:
+    """Awaitable counterpart of Database for use inside async request handlers"""
+
+    def __init__(self, session: AsyncSession):
+        self.db = session
+
+    async def close(self):
+        """Close the database session"""
+        await self.db.close()
+
+    async def get_billionaires(self) -> List[Billionaire]:
+        result = await self.db.execute(select(BillionaireModel))
+        return [Database._to_billionaire(b) for b in result.scalars()]
+
+    async def get_billionaire(self, billionaire_id: str) -> Optional[Billionaire]:
+        billionaire = await self.db.get(BillionaireModel, billionaire_id)
+        if not billionaire:
+            return None
+        return Database._to_billionaire(billionaire)
+
+    async def get_ranked_billionaires(self, limit: Optional[int] = None) -> List[Billionaire]:
+        """See Database.get_ranked_billionaires"""
+        query = (
+            select(BillionaireModel)
+            .join(BillionaireRankingModel, BillionaireRankingModel.billionaire_id == BillionaireModel.id)
+            .order_by(BillionaireRankingModel.rank)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
+        return [Database._to_billionaire(b) for b in result.scalars()]
+
+    async def get_rank(self, billionaire_id: str) -> Optional[int]:
+        result = await self.db.execute(
+            select(BillionaireRankingModel.rank)
+            .where(BillionaireRankingModel.billionaire_id == billionaire_id)
+        )
+        return result.scalar()
+
+    async def get_rankings_page(self, limit: int, after: Optional[Tuple[float, str]] = None) -> List[Billionaire]:
+        """See Database.get_rankings_page"""
+        query = select(BillionaireModel)
+        if after is not None:
+            query = query.where(ranking_keyset_filter(*after))
+        query = query.order_by(BillionaireModel.overall_score.desc(), BillionaireModel.id).limit(limit)
+        result = await self.db.execute(query)
+        return [Database._to_billionaire(b) for b in result.scalars()]
+
+    async def get_ranking_version(self) -> int:
+        snapshot = await self.db.get(RankingSnapshotModel, RANKING_SNAPSHOT_ID)
+        return snapshot.version if snapshot else 0
+
+    async def save_vote(self, vote: Vote):
+        await self.save_votes([vote])
+
+    async def save_votes(self, votes: List[Vote]):
+        """See Database.save_votes"""
+        await self.run_sync(lambda sync_db: sync_db.save_votes(votes))
+
+    async def save_report(self, report: Report):
+        self.db.add(ReportModel(
+            user_id=report.user_id,
+            billionaire_id=report.billionaire_id,
+            evidence=report.evidence,
+            category=report.category,
+            timestamp=report.timestamp,
+            status=report.status
+        ))
+        await self.db.commit()
+
+    async def get_votes(self) -> List[dict]:
+        result = await self.db.execute(select(VoteModel.category, VoteModel.weight))
+        return [
+            {
+                'category': category,
+                'weight': weight
+            } for category, weight in result
+        ]
+
+    async def run_sync(self, fn: Callable[[Database], T]) -> T:
+        """Run synchronous Database logic on this session's connection without blocking the event loop"""
+        return await self.db.run_sync(lambda session: fn(Database(session)))
@@ -1,61 +1,304 @@
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 from models import Billionaire, Vote, Report
-from database_models import BillionaireModel, VoteModel, ReportModel
-from db_config import get_db
+from database_models import BillionaireModel, BillionaireRankingModel, VoteModel, ReportModel, VoteAggregateModel, VoteBucketModel, RankingSnapshotModel, ScrapeResultModel, CompanyModel, BillionaireCompanyModel, CompanyScrapeResultModel
+from db_config import get_db, get_read_db, read_router
+from scoring import CATEGORIES, DEFAULT_WEIGHTS
+from vote_weighting import VOTE_WEIGHTING, bucket_start, decay_factor, needs_rebase, window_start
 from datetime import datetime
+import logging
+import os
+import re
+import unicodedata
+import zlib
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RANKING_SNAPSHOT_ID = 1
+WEIGHT_TOLERANCE = 1e-9
+
+# zlib level for stored scrape text; 6 is zlib's own default balance of speed and size
+SCRAPE_TEXT_COMPRESSION_LEVEL = int(os.environ.get("SCRAPE_TEXT_COMPRESSION_LEVEL", "6"))
+
+# (category, weight, timestamp, +1 for a cast vote or -1 for a retracted one)
+VoteChange = Tuple[str, float, datetime, int]
+
+# (billionaire_id or company_id, source, fetched_at, numeric scores, raw text or None, body hash, text hash)
+ScrapeResult = Tuple[str, str, datetime, Dict[str, float], Optional[str], Optional[str], Optional[str]]
+
+def company_id(name: str) -> str:
+    """Stable company ID from its name, e.g. "L'Oréal Group" -> l-oreal-group"""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-")
+
+def ranking_keyset_filter(last_score: float, last_id: str):
+    """
+    Rows after (last_score, last_id) in (overall_score DESC, id ASC) order. The
+    leading overall_score <= bound lets the index seek to the page instead of
+    walking it from the top, so deep pages cost the same as the first.
+    """
+    return and_(
+        BillionaireModel.overall_score <= last_score,
+        or_(
+            BillionaireModel.overall_score < last_score,
+            and_(BillionaireModel.overall_score == last_score, BillionaireModel.id > last_id)
+        )
+    )
 
 class Database:
-    def __init__(self):
-        self.db: Session = next(get_db())
+    def __init__(self, session: Optional[Session] = None, read_from_primary: bool = False):
+        self.db: Session = session if session is not None else next(get_db())
+        # An injected session (or a client that just wrote) reads from the primary too
+        self._read_session: Optional[Session] = self.db if session is not None or read_from_primary else None
 
     def close(self):
         """Close the database session"""
+        if self._read_session is not None and self._read_session is not self.db:
+            self._read_session.close()
         if self.db:
             self.db.close()
 
+    @property
+    def read_db(self) -> Session:
+        """Session for read-only queries, opened lazily on a replica"""
+        if self._read_session is None:
+            self._read_session = next(get_read_db())
+        return self._read_session
+
+    def _read(self, query: Callable[[Session], T]) -> T:
+        """Run a read-only query on a replica, falling back to the primary if the replica fails"""
+        try:
+            return query(self.read_db)
+        except OperationalError:
+            if self.read_db is self.db:
+                raise
+            logger.warning("Read replica failed, retrying on the primary", exc_info=True)
+            read_router.mark_down(self.read_db.get_bind())
+            self.read_db.close()
+            self._read_session = self.db
+            return query(self.db)
+
     def get_billionaires(self) -> List[Billionaire]:
-        billionaires = self.db.query(BillionaireModel).all()
-        return [
-            Billionaire(
-                id=b.id,
-                name=b.name,
-                net_worth=b.net_worth,
-                social_score=b.social_score,
-                environmental_score=b.environmental_score,
-                political_score=b.political_score,
-                philanthropy_score=b.philanthropy_score,
-                cultural_score=b.cultural_score,
-                overall_score=b.overall_score
-            ) for b in billionaires
-        ]
+        return self._read(lambda db: [self._to_billionaire(b) for b in db.query(BillionaireModel).all()])
+
+    def get_billionaires_after(self, after: Optional[str], limit: int) -> List[Billionaire]:
+        """Up to limit billionaires in ID order, starting after the given ID (keyset pagination)"""
+        def query_chunk(db: Session) -> List[Billionaire]:
+            query = db.query(BillionaireModel)
+            if after is not None:
+                query = query.filter(BillionaireModel.id > after)
+            return [self._to_billionaire(b) for b in query.order_by(BillionaireModel.id).limit(limit).all()]
+
+        return self._read(query_chunk)
+
+    def get_billionaires_by_id(self, billionaire_ids: List[str]) -> List[Billionaire]:
+        return self._read(lambda db: [
+            self._to_billionaire(b)
+            for b in db.query(BillionaireModel).filter(BillionaireModel.id.in_(billionaire_ids)).all()
+        ])
+
+    def get_rankings_page(self, limit: int, after: Optional[Tuple[float, str]] = None) -> List[Billionaire]:
+        """
+        One page of the ranking ordered by (overall_score DESC, id ASC).
+        after: (overall_score, id) of the last row of the previous page
+        """
+        def query_page(db: Session) -> List[Billionaire]:
+            query = db.query(BillionaireModel)
+            if after is not None:
+                query = query.filter(ranking_keyset_filter(*after))
+            billionaires = (
+                query.order_by(BillionaireModel.overall_score.desc(), BillionaireModel.id)
+                .limit(limit)
+                .all()
+            )
+            return [self._to_billionaire(b) for b in billionaires]
+
+        return self._read(query_page)
+
+    def get_ranked_billionaires(self, limit: Optional[int] = None) -> List[Billionaire]:
+        """Billionaires in rank order, read from the materialized rankings table"""
+        def query_ranked(db: Session) -> List[Billionaire]:
+            query = (
+                db.query(BillionaireModel)
+                .join(BillionaireRankingModel, BillionaireRankingModel.billionaire_id == BillionaireModel.id)
+                .order_by(BillionaireRankingModel.rank)
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            return [self._to_billionaire(b) for b in query.all()]
+
+        return self._read(query_ranked)
+
+    def get_rank(self, billionaire_id: str) -> Optional[int]:
+        return self._read(lambda db: (
+            db.query(BillionaireRankingModel.rank)
+            .filter(BillionaireRankingModel.billionaire_id == billionaire_id)
+            .scalar()
+        ))
 
     def get_billionaire(self, billionaire_id: str) -> Optional[Billionaire]:
-        billionaire = self.db.query(BillionaireModel).filter(BillionaireModel.id == billionaire_id).first()
+        billionaire = self._read(
+            lambda db: db.query(BillionaireModel).filter(BillionaireModel.id == billionaire_id).first()
+        )
         if not billionaire:
             return None
+        return self._to_billionaire(billionaire)
+
+    @staticmethod
+    def _to_billionaire(b: BillionaireModel) -> Billionaire:
         return Billionaire(
-            id=billionaire.id,
-            name=billionaire.name,
-            net_worth=billionaire.net_worth,
-            social_score=billionaire.social_score,
-            environmental_score=billionaire.environmental_score,
-            political_score=billionaire.political_score,
-            philanthropy_score=billionaire.philanthropy_score,
-            cultural_score=billionaire.cultural_score,
-            overall_score=billionaire.overall_score
+            id=b.id,
+            name=b.name,
+            net_worth=b.net_worth,
+            social_score=b.social_score,
+            environmental_score=b.environmental_score,
+            political_score=b.political_score,
+            philanthropy_score=b.philanthropy_score,
+            cultural_score=b.cultural_score,
+            overall_score=b.overall_score
         )
 
     def save_vote(self, vote: Vote):
-        vote_model = VoteModel(
-            user_id=vote.user_id,
-            category=vote.category,
-            weight=vote.weight,
-            timestamp=vote.timestamp
+        self.save_votes([vote])
+
+    def save_votes(self, votes: List[Vote]):
+        """
+        Record a batch of votes in a single commit. Each user has one vote per
+        category: a new vote replaces the previous one, and the aggregates
+        move by the difference instead of being recomputed.
+        """
+        if not votes:
+            return
+        # Within a batch, the last vote for a (user, category) wins
+        latest = {(vote.user_id, vote.category): vote for vote in votes}
+
+        # Serialize with every other batch touching these categories before reading the
+        # votes being replaced; a lock on those votes alone can't cover a first vote
+        aggregates = self._lock_vote_aggregates({category for _, category in latest})
+
+        # Plain IN lists keep this on the (user_id, category) index on every backend,
+        # where a row-value IN may not; the few extra rows are filtered out below
+        existing = (
+            self.db.query(VoteModel.user_id, VoteModel.category, VoteModel.weight, VoteModel.timestamp)
+            .filter(
+                VoteModel.user_id.in_({user_id for user_id, _ in latest}),
+                VoteModel.category.in_({category for _, category in latest})
+            )
+            .all()
         )
-        self.db.add(vote_model)
+        changes: List[VoteChange] = [
+            (category, weight, timestamp, -1)
+            for user_id, category, weight, timestamp in existing
+            if (user_id, category) in latest
+        ]
+        changes.extend((vote.category, vote.weight, vote.timestamp, 1) for vote in latest.values())
+
+        statement = self._dialect_insert(VoteModel)
+        self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[VoteModel.user_id, VoteModel.category],
+                set_={
+                    'weight': statement.excluded.weight,
+                    'timestamp': statement.excluded.timestamp
+                }
+            ),
+            [
+                {
+                    'user_id': vote.user_id,
+                    'category': vote.category,
+                    'weight': vote.weight,
+                    'timestamp': vote.timestamp
+                } for vote in latest.values()
+            ]
+        )
+        self._apply_vote_changes(aggregates, changes)
         self.db.commit()
 
+    def _lock_vote_aggregates(self, categories) -> Dict[str, VoteAggregateModel]:
+        """Create any missing aggregate rows, then lock them in a fixed order so concurrent batches can't deadlock"""
+        categories = sorted(categories)
+        self.db.execute(
+            self._dialect_insert(VoteAggregateModel)
+            .values([
+                {'category': category, 'weight_sum': 0, 'vote_count': 0, 'decayed_sum': 0, 'decayed_count': 0}
+                for category in categories
+            ])
+            .on_conflict_do_nothing(index_elements=[VoteAggregateModel.category])
+        )
+        aggregates = (
+            self.db.query(VoteAggregateModel)
+            .filter(VoteAggregateModel.category.in_(categories))
+            .order_by(VoteAggregateModel.category)
+            .with_for_update()
+            .all()
+        )
+        return {aggregate.category: aggregate for aggregate in aggregates}
+
+    def _apply_vote_changes(self, aggregates: Dict[str, VoteAggregateModel], changes: List[VoteChange]):
+        """Fold votes into the all-time, decayed and windowed aggregates within the current transaction"""
+        now = datetime.now()
+        by_category: Dict[str, List[VoteChange]] = {}
+        for change in changes:
+            by_category.setdefault(change[0], []).append(change)
+        for category, category_changes in by_category.items():
+            self._apply_to_vote_aggregate(aggregates[category], category_changes, now)
+        self._apply_to_vote_buckets(changes, now)
+
+    def _apply_to_vote_aggregate(self, aggregate: VoteAggregateModel, changes: List[VoteChange], now: datetime):
+        if aggregate.decay_epoch is None:
+            aggregate.decay_epoch = now
+        elif needs_rebase(now, aggregate.decay_epoch):
+            scale = decay_factor(aggregate.decay_epoch, now)
+            aggregate.decayed_sum *= scale
+            aggregate.decayed_count *= scale
+            aggregate.decay_epoch = now
+
+        for _, weight, timestamp, count in changes:
+            factor = decay_factor(timestamp, aggregate.decay_epoch)
+            aggregate.weight_sum += weight * count
+            aggregate.vote_count += count
+            aggregate.decayed_sum += weight * factor * count
+            aggregate.decayed_count += factor * count
+
+    def _apply_to_vote_buckets(self, changes: List[VoteChange], now: datetime):
+        cutoff = window_start(now)
+        totals: Dict[Tuple[datetime, str], Tuple[float, int]] = {}
+        for category, weight, timestamp, count in changes:
+            start = bucket_start(timestamp)
+            if start < cutoff:
+                continue
+            weight_sum, vote_count = totals.get((start, category), (0.0, 0))
+            totals[(start, category)] = (weight_sum + weight * count, vote_count + count)
+
+        if totals:
+            statement = self._dialect_insert(VoteBucketModel)
+            self.db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[VoteBucketModel.bucket_start, VoteBucketModel.category],
+                    set_={
+                        'weight_sum': VoteBucketModel.weight_sum + statement.excluded.weight_sum,
+                        'vote_count': VoteBucketModel.vote_count + statement.excluded.vote_count
+                    }
+                ),
+                [
+                    {'bucket_start': start, 'category': category, 'weight_sum': weight_sum, 'vote_count': vote_count}
+                    for (start, category), (weight_sum, vote_count) in totals.items()
+                ]
+            )
+        self.db.execute(delete(VoteBucketModel).where(VoteBucketModel.bucket_start < cutoff))
+
+    def _dialect_insert(self, model):
+        """INSERT that supports ON CONFLICT on both Postgres and SQLite"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return postgresql_insert(model)
+        return sqlite_insert(model)
+
     def save_report(self, report: Report):
         report_model = ReportModel(
             user_id=report.user_id,
@@ -68,20 +311,338 @@ class Database:
         self.db.add(report_model)
         self.db.commit()
 
-    def update_billionaire_scores(self, weights: dict):
-        billionaires = self.db.query(BillionaireModel).all()
-        for b in billionaires:
-            b.overall_score = (
-                b.social_score * weights['social'] +
-                b.environmental_score * weights['environmental'] +
-                b.political_score * weights['political'] +
-                b.philanthropy_score * weights['philanthropy'] +
-                b.cultural_score * weights['cultural']
+    def save_scrape_results(self, results: List[ScrapeResult]):
+        """
+        Upsert the latest scrape of each (billionaire, source) in one statement.
+        A result without raw text (its pages were unchanged) keeps the stored text.
+        """
+        self._upsert_scrape_results(ScrapeResultModel, ScrapeResultModel.billionaire_id, results)
+
+    def save_company_scrape_results(self, results: List[ScrapeResult]):
+        """Upsert the latest scrape of each (company, source), like save_scrape_results()"""
+        self._upsert_scrape_results(CompanyScrapeResultModel, CompanyScrapeResultModel.company_id, results)
+
+    def _upsert_scrape_results(self, model, key, results: List[ScrapeResult]):
+        if not results:
+            return
+        rows = [
+            {
+                key.key: entity_id,
+                "source": source,
+                "fetched_at": fetched_at,
+                "scores": scores,
+                "raw_text": zlib.compress(raw_text.encode(), SCRAPE_TEXT_COMPRESSION_LEVEL) if raw_text else None,
+                "body_hash": body_hash,
+                "text_hash": text_hash
+            }
+            for entity_id, source, fetched_at, scores, raw_text, body_hash, text_hash in results
+        ]
+        statement = self._dialect_insert(model).values(rows)
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[key, model.source],
+            set_={
+                "fetched_at": statement.excluded.fetched_at,
+                "scores": statement.excluded.scores,
+                "raw_text": func.coalesce(statement.excluded.raw_text, model.raw_text),
+                "body_hash": statement.excluded.body_hash,
+                "text_hash": statement.excluded.text_hash
+            }
+        ))
+        self.db.commit()
+
+    def get_scrape_fingerprints(self, billionaire_ids: List[str]) -> List[Tuple[str, str, Optional[str], Optional[str], dict]]:
+        """(billionaire_id, source, body_hash, text_hash, scores) of the latest scrapes of these billionaires"""
+        return self._scrape_fingerprints(ScrapeResultModel, ScrapeResultModel.billionaire_id, billionaire_ids)
+
+    def get_company_scrape_fingerprints(self, company_ids: List[str]) -> List[Tuple[str, str, Optional[str], Optional[str], dict]]:
+        """(company_id, source, body_hash, text_hash, scores) of the latest scrapes of these companies"""
+        return self._scrape_fingerprints(CompanyScrapeResultModel, CompanyScrapeResultModel.company_id, company_ids)
+
+    def get_company_scores_since(self, company_ids: List[str], since: datetime) -> List[Tuple[str, str, dict]]:
+        """(company_id, source, scores) of these companies' scrapes saved at or after since"""
+        if not company_ids:
+            return []
+        return [
+            tuple(row) for row in self.db.execute(
+                select(CompanyScrapeResultModel.company_id, CompanyScrapeResultModel.source, CompanyScrapeResultModel.scores)
+                .where(CompanyScrapeResultModel.company_id.in_(company_ids), CompanyScrapeResultModel.fetched_at >= since)
+            )
+        ]
+
+    def _scrape_fingerprints(self, model, key, ids: List[str]) -> List[Tuple[str, str, Optional[str], Optional[str], dict]]:
+        if not ids:
+            return []
+        # From the primary: a lagging replica would only cost re-parsing, but the primary is what the upsert wrote
+        return [
+            tuple(row) for row in self.db.execute(
+                select(key, model.source, model.body_hash, model.text_hash, model.scores).where(key.in_(ids))
+            )
+        ]
+
+    def get_scrape_text(self, billionaire_id: str, source: str) -> Optional[str]:
+        """
+        Decompressed raw text of the latest scrape, if one was stored. For a
+        source scraped per company, the texts of the billionaire's companies.
+        """
+        def query_text(db: Session) -> List[bytes]:
+            company_texts = db.execute(
+                select(CompanyScrapeResultModel.raw_text)
+                .join(BillionaireCompanyModel, BillionaireCompanyModel.company_id == CompanyScrapeResultModel.company_id)
+                .where(BillionaireCompanyModel.billionaire_id == billionaire_id, CompanyScrapeResultModel.source == source)
+                .order_by(CompanyScrapeResultModel.company_id)
+            ).scalars().all()
+            if company_texts:
+                return company_texts
+            return db.execute(
+                select(ScrapeResultModel.raw_text)
+                .where(ScrapeResultModel.billionaire_id == billionaire_id, ScrapeResultModel.source == source)
+            ).scalars().all()
+
+        texts = [zlib.decompress(raw_text).decode() for raw_text in self._read(query_text) if raw_text]
+        return "\n\n".join(texts) if texts else None
+
+    def link_companies(self, companies: Dict[str, List[str]]) -> int:
+        """
+        Replace the company links of the given billionaires ({billionaire_id:
+        [company name]}), adding companies not seen before; returns the number of links
+        """
+        names = {company_id(name): name for names in companies.values() for name in names if company_id(name)}
+        if names:
+            self.db.execute(
+                self._dialect_insert(CompanyModel)
+                .values([{"id": key, "name": name} for key, name in names.items()])
+                .on_conflict_do_nothing(index_elements=[CompanyModel.id])
+            )
+        self.db.execute(delete(BillionaireCompanyModel).where(BillionaireCompanyModel.billionaire_id.in_(list(companies))))
+        links = {
+            (billionaire_id, company_id(name))
+            for billionaire_id, names in companies.items()
+            for name in names
+            if company_id(name)
+        }
+        if links:
+            self.db.execute(insert(BillionaireCompanyModel), [
+                {"billionaire_id": billionaire_id, "company_id": key} for billionaire_id, key in sorted(links)
+            ])
+        self.db.commit()
+        return len(links)
+
+    def get_billionaire_companies(self, billionaire_ids: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+        """{billionaire_id: [(company_id, name)]} for the billionaires that have companies"""
+        rows = self.db.execute(
+            select(BillionaireCompanyModel.billionaire_id, CompanyModel.id, CompanyModel.name)
+            .join(CompanyModel, CompanyModel.id == BillionaireCompanyModel.company_id)
+            .where(BillionaireCompanyModel.billionaire_id.in_(billionaire_ids))
+            .order_by(BillionaireCompanyModel.billionaire_id, CompanyModel.id)
+        )
+        companies: Dict[str, List[Tuple[str, str]]] = {}
+        for billionaire_id, key, name in rows:
+            companies.setdefault(billionaire_id, []).append((key, name))
+        return companies
+
+    def apply_scraped_scores(self, scores: Dict[str, Dict[str, float]]) -> int:
+        """
+        Write freshly scraped category scores ({billionaire_id: {column: score}})
+        with one set-based UPDATE, re-rank under the current snapshot's weights
+        and publish a new ranking snapshot version.
+        """
+        snapshot = self._lock_ranking_snapshot()
+        if not scores:
+            self.db.rollback()
+            return snapshot.version if snapshot is not None else 0
+        weights = snapshot.weights if snapshot is not None else dict(DEFAULT_WEIGHTS)
+        ids = list(scores)
+
+        columns = {column for billionaire_scores in scores.values() for column in billionaire_scores}
+        values = {
+            column: case(
+                {billionaire_id: billionaire_scores[column]
+                 for billionaire_id, billionaire_scores in scores.items() if column in billionaire_scores},
+                value=BillionaireModel.id,
+                else_=getattr(BillionaireModel, column)
+            )
+            for column in sorted(columns)
+        }
+        self.db.execute(
+            update(BillionaireModel)
+            .where(BillionaireModel.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        # A second statement, so the overall score sees the new category scores
+        overall_score = sum(
+            getattr(BillionaireModel, f"{category}_score") * weights[category]
+            for category in CATEGORIES
+        )
+        self.db.execute(
+            update(BillionaireModel)
+            .where(BillionaireModel.id.in_(ids))
+            .values(overall_score=overall_score)
+            .execution_options(synchronize_session=False)
+        )
+        self._refresh_rankings()
+        version = self._publish_ranking_snapshot(snapshot, weights)
+        self.db.commit()
+        return version
+
+    def update_billionaire_scores(self, weights: dict) -> int:
+        """Recompute every overall score and publish a new ranking snapshot version"""
+        snapshot = self._lock_ranking_snapshot()
+        version = self._recompute_ranking_snapshot(snapshot, weights)
+        self.db.commit()
+        return version
+
+    def refresh_ranking_snapshot(self, weights: dict) -> int:
+        """Recompute overall scores only if the weights differ from the current snapshot"""
+        snapshot = self._lock_ranking_snapshot()
+        if snapshot is not None and self._same_weights(snapshot.weights, weights):
+            self.db.rollback()
+            return snapshot.version
+        version = self._recompute_ranking_snapshot(snapshot, weights)
+        self.db.commit()
+        return version
+
+    def get_ranking_version(self) -> int:
+        snapshot = self.db.get(RankingSnapshotModel, RANKING_SNAPSHOT_ID)
+        return snapshot.version if snapshot else 0
+
+    def _lock_ranking_snapshot(self) -> Optional[RankingSnapshotModel]:
+        """Load the snapshot row, serializing concurrent recomputations on it"""
+        return (
+            self.db.query(RankingSnapshotModel)
+            .filter(RankingSnapshotModel.id == RANKING_SNAPSHOT_ID)
+            .with_for_update()
+            .first()
+        )
+
+    def _recompute_ranking_snapshot(self, snapshot: Optional[RankingSnapshotModel], weights: dict) -> int:
+        # One set-based UPDATE on the server instead of a flush per row
+        overall_score = sum(
+            getattr(BillionaireModel, f"{category}_score") * weights[category]
+            for category in CATEGORIES
+        )
+        self.db.execute(
+            update(BillionaireModel)
+            .values(overall_score=overall_score)
+            .execution_options(synchronize_session=False)
+        )
+        self._refresh_rankings()
+        return self._publish_ranking_snapshot(snapshot, weights)
+
+    def _publish_ranking_snapshot(self, snapshot: Optional[RankingSnapshotModel], weights: dict) -> int:
+        if snapshot is None:
+            snapshot = RankingSnapshotModel(id=RANKING_SNAPSHOT_ID, version=0)
+            self.db.add(snapshot)
+        snapshot.version += 1
+        snapshot.weights = dict(weights)
+        snapshot.updated_at = datetime.utcnow()
+        return snapshot.version
+
+    def _refresh_rankings(self):
+        """
+        Rebuild the materialized rankings inside the caller's transaction,
+        so readers see either the old or the new ranking, never a mix.
+        """
+        ranked = select(
+            func.row_number().over(
+                order_by=(BillionaireModel.overall_score.desc(), BillionaireModel.id)
+            ),
+            BillionaireModel.id,
+            BillionaireModel.overall_score
+        )
+        self.db.execute(delete(BillionaireRankingModel))
+        self.db.execute(
+            insert(BillionaireRankingModel).from_select(
+                ['rank', 'billionaire_id', 'overall_score'], ranked
             )
+        )
+
+    @staticmethod
+    def _same_weights(current: dict, weights: dict) -> bool:
+        if set(current) != set(weights):
+            return False
+        return all(abs(current[category] - weights[category]) <= WEIGHT_TOLERANCE for category in weights)
+
+    def get_vote_aggregates(self, weighting: str = VOTE_WEIGHTING) -> Dict[str, dict]:
+        """Per-category vote sums and counts under the given weighting ("all", "decay" or "window")"""
+        # Always from the primary: these feed snapshot recomputation, which must not see replica lag
+        if weighting == "window":
+            totals = (
+                self.db.query(VoteBucketModel.category, func.sum(VoteBucketModel.weight_sum), func.sum(VoteBucketModel.vote_count))
+                .filter(VoteBucketModel.bucket_start >= window_start(datetime.now()))
+                .group_by(VoteBucketModel.category)
+                .all()
+            )
+            return {
+                category: {
+                    'sum': weight_sum,
+                    'count': vote_count
+                } for category, weight_sum, vote_count in totals
+            }
+
+        aggregates = self.db.query(VoteAggregateModel).all()
+        if weighting == "decay":
+            return {
+                a.category: {
+                    'sum': a.decayed_sum,
+                    # The exact count decides emptiness; float drift must not leave a phantom vote
+                    'count': a.decayed_count if a.vote_count > 0 else 0
+                } for a in aggregates
+            }
+        return {
+            a.category: {
+                'sum': a.weight_sum,
+                'count': a.vote_count
+            } for a in aggregates
+        }
+
+    def rebuild_vote_aggregates(self):
+        """Recompute the all-time, decayed and windowed vote aggregates from the raw votes table"""
+        # Hold the aggregate locks save_votes takes until the commit, so no batch lands between the scan and the rewrite
+        self._lock_vote_aggregates(CATEGORIES)
+        now = datetime.now()
+        cutoff = window_start(now)
+        totals: Dict[str, List[float]] = {}
+        buckets: Dict[Tuple[datetime, str], List[float]] = {}
+        votes = self.db.query(VoteModel.category, VoteModel.weight, VoteModel.timestamp).yield_per(10000)
+        for category, weight, timestamp in votes:
+            timestamp = timestamp or now
+            factor = decay_factor(timestamp, now)
+            total = totals.setdefault(category, [0.0, 0, 0.0, 0.0])
+            total[0] += weight
+            total[1] += 1
+            total[2] += weight * factor
+            total[3] += factor
+            start = bucket_start(timestamp)
+            if start >= cutoff:
+                bucket = buckets.setdefault((start, category), [0.0, 0])
+                bucket[0] += weight
+                bucket[1] += 1
+
+        # Zero rather than delete so the seeded per-category rows survive a rebuild
+        self.db.execute(
+            update(VoteAggregateModel)
+            .values(weight_sum=0, vote_count=0, decayed_sum=0, decayed_count=0, decay_epoch=now)
+        )
+        for category, (weight_sum, vote_count, decayed_sum, decayed_count) in totals.items():
+            self.db.merge(VoteAggregateModel(
+                category=category,
+                weight_sum=weight_sum,
+                vote_count=vote_count,
+                decayed_sum=decayed_sum,
+                decayed_count=decayed_count,
+                decay_epoch=now
+            ))
+        self.db.execute(delete(VoteBucketModel))
+        if buckets:
+            self.db.execute(insert(VoteBucketModel), [
+                {'bucket_start': start, 'category': category, 'weight_sum': weight_sum, 'vote_count': vote_count}
+                for (start, category), (weight_sum, vote_count) in buckets.items()
+            ])
         self.db.commit()
 
     def get_votes(self) -> List[dict]:
-        votes = self.db.query(VoteModel).all()
+        votes = self._read(lambda db: db.query(VoteModel).all())
         return [
             {
                 'category': v.category,
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Index, LargeBinary, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import os
@@ -19,6 +19,22 @@ class BillionaireModel(Base):
     cultural_score = Column(Float, nullable=False)
     overall_score = Column(Float, nullable=False, default=0)
 
+    __table_args__ = (
+        # Serves ORDER BY overall_score DESC, id for keyset-paginated rankings
+        Index('ix_billionaires_overall_score_id', overall_score.desc(), id),
+        # Serves the refresh scheduler's net-worth ranking
+        Index('ix_billionaires_net_worth_id', net_worth.desc(), id),
+    )
+
+class BillionaireRankingModel(Base):
+    __tablename__ = "billionaire_rankings"
+
+    rank = Column(Integer, primary_key=True)
+    billionaire_id = Column(String, ForeignKey('billionaires.id'), nullable=False, unique=True)
+    overall_score = Column(Float, nullable=False)
+
+    billionaire = relationship("BillionaireModel")
+
 class VoteModel(Base):
     __tablename__ = "votes"
 
@@ -28,6 +44,112 @@ class VoteModel(Base):
     weight = Column(Float, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # One effective vote per user and category; also the upsert's conflict target
+        Index('ix_votes_user_id_category', user_id, category, unique=True),
+    )
+
+class VoteAggregateModel(Base):
+    __tablename__ = "vote_aggregates"
+
+    category = Column(String, primary_key=True)
+    weight_sum = Column(Float, nullable=False, default=0)
+    vote_count = Column(Integer, nullable=False, default=0)
+    # Time-decayed counterparts, each vote scaled by its decay factor relative to decay_epoch
+    decayed_sum = Column(Float, nullable=False, default=0)
+    decayed_count = Column(Float, nullable=False, default=0)
+    decay_epoch = Column(DateTime)
+
+class VoteBucketModel(Base):
+    """Per-category vote totals for one time bucket; buckets older than the window are deleted"""
+    __tablename__ = "vote_buckets"
+
+    bucket_start = Column(DateTime, primary_key=True)
+    category = Column(String, primary_key=True)
+    weight_sum = Column(Float, nullable=False, default=0)
+    vote_count = Column(Integer, nullable=False, default=0)
+
+class RankingSnapshotModel(Base):
+    __tablename__ = "ranking_snapshot"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    weights = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ScrapeResultModel(Base):
+    """Latest scrape of one source for a billionaire; raw_text is zlib-compressed UTF-8"""
+    __tablename__ = "scrape_results"
+
+    billionaire_id = Column(String, ForeignKey('billionaires.id'), primary_key=True)
+    source = Column(String, primary_key=True)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    scores = Column(JSON, nullable=False)
+    raw_text = Column(LargeBinary)
+    # SHA-256 of the downloaded pages and of their extracted text, to skip re-parsing unchanged pages
+    body_hash = Column(String(64))
+    text_hash = Column(String(64))
+
+class CompanyModel(Base):
+    __tablename__ = "companies"
+
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+
+class BillionaireCompanyModel(Base):
+    """Links a billionaire to a company they own or founded"""
+    __tablename__ = "billionaire_companies"
+
+    billionaire_id = Column(String, ForeignKey('billionaires.id'), primary_key=True)
+    company_id = Column(String, ForeignKey('companies.id'), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_billionaire_companies_company_id', company_id),
+    )
+
+class CompanyScrapeResultModel(Base):
+    """
+    Latest scrape of a company-scoped source (CDP, SEC, Glassdoor) for one
+    company, shared by every billionaire linked to it; raw_text is
+    zlib-compressed UTF-8
+    """
+    __tablename__ = "company_scrape_results"
+
+    company_id = Column(String, ForeignKey('companies.id'), primary_key=True)
+    source = Column(String, primary_key=True)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    scores = Column(JSON, nullable=False)
+    raw_text = Column(LargeBinary)
+    body_hash = Column(String(64))
+    text_hash = Column(String(64))
+
+class ScrapeJobModel(Base):
+    """
+    Durable refresh job for one billionaire (see job_queue.py). While a job
+    runs, available_at is the end of its lease; once that passes, the job
+    is queued again for another worker.
+    """
+    __tablename__ = "scrape_jobs"
+
+    billionaire_id = Column(String, ForeignKey('billionaires.id'), primary_key=True)
+    status = Column(String, nullable=False, default="queued")
+    # Higher runs first; set by the refresh scheduler
+    priority = Column(Float, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    lease_token = Column(String)
+    # Total absolute change of the category scores in the last completed run
+    score_change = Column(Float)
+    last_error = Column(String)
+    enqueued_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Serves the claim query: queued jobs in priority order, then in order of availability
+        Index('ix_scrape_jobs_status_priority_available_at', status, priority.desc(), available_at),
+        Index('ix_scrape_jobs_lease_token', lease_token),
+    )
+
 class ReportModel(Base):
     __tablename__ = "reports"
 
@@ -40,3 +162,8 @@ class ReportModel(Base):
     status = Column(String, default="pending")
 
     billionaire = relationship("BillionaireModel")
+
+    __table_args__ = (
+        # Serves the refresh scheduler's recent reports and foreign-key lookups on billionaire_id
+        Index('ix_reports_billionaire_id_status', billionaire_id, status),
+    )
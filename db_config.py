@@ -1,17 +1,203 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from typing import Optional
+import itertools
 import os
+import threading
+import time
 
+# "postgres" (networked, needs DATABASE_URL) or "sqlite" (embedded file).
+# When unset, SQLite is used unless DATABASE_URL is provided.
+DB_BACKEND = os.environ.get("DB_BACKEND", "").lower()
 DATABASE_URL = os.environ.get("DATABASE_URL")
-if DATABASE_URL.startswith("postgres://"):
+SQLITE_PATH = os.environ.get(
+    "SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "billionaire_index.db")
+)
+
+if DB_BACKEND == "sqlite" or (not DB_BACKEND and not DATABASE_URL):
+    DATABASE_URL = f"sqlite:///{os.path.abspath(SQLITE_PATH)}"
+elif not DATABASE_URL:
+    raise ValueError("DATABASE_URL environment variable not set")
+elif DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL)
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+
+# Comma-separated read replica URLs; read-only traffic is spread across them
+DATABASE_REPLICA_URLS = [
+    url.strip().replace("postgres://", "postgresql://", 1)
+    for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+# How long a failed replica is skipped before it is tried (or probed) again
+REPLICA_RETRY_SECONDS = float(os.environ.get("REPLICA_RETRY_SECONDS", "10"))
+# How long a client that just wrote keeps reading from the primary
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Connection pool tuning for the async engine
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+
+# SQLite tuning: WAL lets readers proceed while the single writer commits
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_READ_POOL_SIZE = int(os.environ.get("SQLITE_READ_POOL_SIZE", "8"))
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    # A negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+def _apply_sqlite_write_pragmas(dbapi_connection, connection_record):
+    _apply_sqlite_pragmas(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.close()
+
+def _sqlite_read_only_url(url: str) -> str:
+    """Open the same file through a read-only URI so pooled readers can never take the write lock"""
+    parsed = make_url(url)
+    return parsed.set(
+        database=f"file:{parsed.database}",
+        query={**parsed.query, "mode": "ro", "uri": "true"}
+    ).render_as_string(hide_password=False)
+
+def _engine_options(url: str, read_only: bool) -> dict:
+    if make_url(url).get_backend_name() != "sqlite":
+        return {
+            "pool_pre_ping": True,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+        }
+    if read_only:
+        return {"pool_size": SQLITE_READ_POOL_SIZE, "max_overflow": 0, "pool_timeout": DB_POOL_TIMEOUT}
+    # SQLite allows one writer at a time; a single pooled connection avoids SQLITE_BUSY churn
+    return {"pool_size": 1, "max_overflow": 0, "pool_timeout": DB_POOL_TIMEOUT}
+
+def _build_sync_engine(url: str, read_only: bool = False):
+    if IS_SQLITE and read_only:
+        url = _sqlite_read_only_url(url)
+    built = create_engine(url, **_engine_options(url, read_only))
+    if IS_SQLITE:
+        event.listen(built, "connect", _apply_sqlite_pragmas if read_only else _apply_sqlite_write_pragmas)
+    return built
+
+class ReplicaRouter:
+    """
+    Round-robin choice among read replicas. A replica that fails is
+    skipped for REPLICA_RETRY_SECONDS (or until a probe marks it up);
+    with no healthy replica, reads fall back to the primary.
+    """
+
+    def __init__(self, primary, replicas, retry_seconds: float = REPLICA_RETRY_SECONDS):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self._retry_seconds = retry_seconds
+        self._down_until = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self):
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._turn) % len(self.replicas)]
+            if self._down_until.get(id(replica), 0) <= now:
+                return replica
+        return self.primary
+
+    def mark_down(self, replica):
+        if replica is self.primary:
+            return
+        with self._lock:
+            self._down_until[id(replica)] = time.monotonic() + self._retry_seconds
+
+    def mark_up(self, replica):
+        with self._lock:
+            self._down_until.pop(id(replica), None)
+
+    def down_replicas(self) -> list:
+        return [replica for replica in self.replicas if id(replica) in self._down_until]
+
+def _replica_urls() -> list:
+    # Embedded SQLite has no replicas; its read-only connection pool plays that role
+    return [DATABASE_URL] if IS_SQLITE else DATABASE_REPLICA_URLS
+
+if IS_SQLITE:
+    os.makedirs(os.path.dirname(make_url(DATABASE_URL).database), exist_ok=True)
+
+engine = _build_sync_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if IS_SQLITE:
+    # Create the file and switch it to WAL before any read-only connection opens it
+    with engine.connect():
+        pass
+read_router = ReplicaRouter(engine, [_build_sync_engine(url, read_only=True) for url in _replica_urls()])
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Session on a healthy replica (or the primary when there is none)"""
+    db = SessionLocal(bind=read_router.choose())
+    try:
+        yield db
+    finally:
+        db.close()
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        # asyncpg spells libpq's sslmode as ssl
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+def create_async_db_engine(url: Optional[str] = None, read_only: bool = False) -> AsyncEngine:
+    """
+    Build a pooled async engine; called once per process from the app lifespan.
+    With SQLite, read_only=True gives a separate pool of read-only connections.
+    """
+    url = url or DATABASE_URL
+    if IS_SQLITE and read_only:
+        url = _sqlite_read_only_url(url)
+    async_engine = create_async_engine(to_async_url(url), **_engine_options(url, read_only))
+    if IS_SQLITE:
+        event.listen(
+            async_engine.sync_engine,
+            "connect",
+            _apply_sqlite_pragmas if read_only else _apply_sqlite_write_pragmas
+        )
+    return async_engine
+
+def create_async_session_factory(async_engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def create_async_read_router(primary: AsyncEngine) -> ReplicaRouter:
+    """Async counterpart of read_router, sharing the given primary engine"""
+    return ReplicaRouter(primary, [create_async_db_engine(url, read_only=True) for url in _replica_urls()])
@@ -0,0 +1,241 @@
+from sqlalchemy import case, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from database_models import BillionaireModel, ScrapeJobModel
+from datetime import datetime, timedelta
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed job stays invisible to other workers before it is retried
+JOB_VISIBILITY_TIMEOUT_SECONDS = int(os.environ.get("JOB_VISIBILITY_TIMEOUT_SECONDS", "900"))
+# Failed attempts before a job is given up on
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "5"))
+# Retry delay after the first failure; doubles with every further attempt
+JOB_RETRY_BASE_SECONDS = int(os.environ.get("JOB_RETRY_BASE_SECONDS", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class JobQueue:
+    """
+    Durable queue of scrape jobs in the application database, one row per
+    billionaire. A claimed job is leased: its available_at moves to the end
+    of the visibility timeout, so if its worker dies the job is queued
+    again once the lease runs out. Completing or failing a job requires the lease token,
+    which keeps a worker whose lease expired from overwriting the result
+    of the worker that took the job over. The rows double as the refresh's
+    checkpoint: restarted workers simply carry on with what is left.
+    """
+
+    def __init__(self, session: Session):
+        self.db = session
+
+    def enqueue(self, billionaire_ids: Optional[List[str]] = None) -> int:
+        """
+        Queue a job for each billionaire (all of them by default). Jobs that
+        are already queued or running are left alone, so re-enqueueing a
+        refresh that is under way resumes it rather than starting over.
+        """
+        now = datetime.utcnow()
+        selected = (
+            (BillionaireModel.id.in_(billionaire_ids),) if billionaire_ids is not None else ()
+        )
+        # Revive finished jobs, then add jobs for billionaires that have none
+        revived = self.db.execute(
+            update(ScrapeJobModel)
+            .where(
+                ScrapeJobModel.status.in_((DONE, FAILED)),
+                ScrapeJobModel.billionaire_id.in_(select(BillionaireModel.id).where(*selected))
+            )
+            .values(status=QUEUED, attempts=0, available_at=now, lease_token=None, last_error=None, enqueued_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        added = self.db.execute(
+            insert(ScrapeJobModel)
+            .from_select(
+                ['billionaire_id', 'status', 'attempts', 'available_at', 'enqueued_at'],
+                select(BillionaireModel.id, literal(QUEUED), literal(0), literal(now), literal(now))
+                .where(~BillionaireModel.id.in_(select(ScrapeJobModel.billionaire_id)), *selected)
+            )
+            .on_conflict_do_nothing(index_elements=[ScrapeJobModel.billionaire_id])
+        ).rowcount
+        self.db.commit()
+        return revived + added
+
+    def schedule(self, priorities: Dict[str, float]) -> int:
+        """
+        Queue jobs with the given priorities ({billionaire_id: priority}).
+        Like enqueue(), jobs already queued or running are left alone.
+        """
+        if not priorities:
+            return 0
+        now = datetime.utcnow()
+        insert = postgresql_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = insert(ScrapeJobModel).values([
+            {
+                "billionaire_id": billionaire_id,
+                "status": QUEUED,
+                "priority": priority,
+                "attempts": 0,
+                "available_at": now,
+                "enqueued_at": now
+            }
+            for billionaire_id, priority in priorities.items()
+        ])
+        scheduled = self.db.execute(statement.on_conflict_do_update(
+            index_elements=[ScrapeJobModel.billionaire_id],
+            set_={
+                "status": QUEUED,
+                "priority": statement.excluded.priority,
+                "attempts": 0,
+                "available_at": now,
+                "lease_token": None,
+                "last_error": None,
+                "enqueued_at": now
+            },
+            where=ScrapeJobModel.status.in_((DONE, FAILED))
+        )).rowcount
+        self.db.commit()
+        return scheduled
+
+    def claim(self, limit: int, visibility_timeout: int = JOB_VISIBILITY_TIMEOUT_SECONDS) -> Tuple[str, List[str]]:
+        """Lease up to limit available jobs; returns the lease token and the leased billionaire IDs"""
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        self._fail_abandoned(now)
+        self._requeue_expired(now)
+        # Queued jobs only, so the claim walks ix_scrape_jobs_status_priority_available_at in order
+        available = (
+            ScrapeJobModel.status == QUEUED,
+            ScrapeJobModel.available_at <= now,
+            ScrapeJobModel.attempts < JOB_MAX_ATTEMPTS
+        )
+        candidates = (
+            select(ScrapeJobModel.billionaire_id)
+            .where(*available)
+            .order_by(ScrapeJobModel.priority.desc(), ScrapeJobModel.available_at)
+            .limit(limit)
+        )
+        if self.db.get_bind().dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+        ids = list(self.db.execute(candidates).scalars())
+        if not ids:
+            self.db.rollback()
+            return token, []
+        # Re-checking availability makes the claim safe where SKIP LOCKED is unavailable:
+        # a job another worker leased in the meantime no longer matches
+        self.db.execute(
+            update(ScrapeJobModel)
+            .where(ScrapeJobModel.billionaire_id.in_(ids), *available)
+            .values(
+                status=RUNNING,
+                lease_token=token,
+                attempts=ScrapeJobModel.attempts + 1,
+                available_at=now + timedelta(seconds=visibility_timeout)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        # Look the candidates up by key: most lease tokens are NULL, so the planner may
+        # not trust ix_scrape_jobs_lease_token and scan the whole table instead
+        leased = self.db.execute(
+            select(ScrapeJobModel.billionaire_id)
+            .where(ScrapeJobModel.billionaire_id.in_(ids), ScrapeJobModel.lease_token == token)
+        ).scalars()
+        return token, list(leased)
+
+    def _fail_abandoned(self, now: datetime):
+        """
+        Give up on jobs whose lease ran out on their last allowed attempt. A
+        worker that dies mid-batch never calls fail(), so without this a job
+        that crashes its worker would be reclaimed forever.
+        """
+        abandoned = (
+            ScrapeJobModel.status == RUNNING,
+            ScrapeJobModel.available_at <= now,
+            ScrapeJobModel.attempts >= JOB_MAX_ATTEMPTS
+        )
+        ids = list(self.db.execute(select(ScrapeJobModel.billionaire_id).where(*abandoned)).scalars())
+        if not ids:
+            return
+        self.db.execute(
+            update(ScrapeJobModel)
+            .where(ScrapeJobModel.billionaire_id.in_(ids), *abandoned)
+            .values(status=FAILED, lease_token=None, last_error="Lease expired on the last attempt", finished_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        for billionaire_id in ids:
+            logger.error(f"Giving up on billionaire {billionaire_id}: its worker never finished the last attempt")
+
+    def _requeue_expired(self, now: datetime):
+        """
+        Put jobs whose lease ran out back in the queue. They keep their lease
+        token, so a slow worker can still complete its job until another
+        worker claims it.
+        """
+        requeued = self.db.execute(
+            update(ScrapeJobModel)
+            .where(ScrapeJobModel.status == RUNNING, ScrapeJobModel.available_at <= now)
+            .values(status=QUEUED)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if requeued:
+            self.db.commit()
+            logger.warning(f"Requeued {requeued} jobs whose lease ran out")
+
+    def complete(self, token: str, billionaire_ids: List[str], score_changes: Optional[Dict[str, float]] = None):
+        """Mark leased jobs as done, recording how much each one changed the scores"""
+        if billionaire_ids:
+            values = dict(status=DONE, lease_token=None, last_error=None, finished_at=datetime.utcnow())
+            if score_changes:
+                values["score_change"] = case(
+                    score_changes, value=ScrapeJobModel.billionaire_id, else_=ScrapeJobModel.score_change
+                )
+            self.db.execute(
+                update(ScrapeJobModel)
+                .where(ScrapeJobModel.lease_token == token, ScrapeJobModel.billionaire_id.in_(billionaire_ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+
+    def fail(self, token: str, errors: Dict[str, str]):
+        """Schedule a retry with exponential backoff for each failed job, or give up after JOB_MAX_ATTEMPTS"""
+        now = datetime.utcnow()
+        jobs = self.db.execute(
+            select(ScrapeJobModel)
+            .where(ScrapeJobModel.lease_token == token, ScrapeJobModel.billionaire_id.in_(list(errors)))
+        ).scalars()
+        for job in jobs:
+            job.lease_token = None
+            job.last_error = errors[job.billionaire_id][:1000]
+            if job.attempts >= JOB_MAX_ATTEMPTS:
+                job.status = FAILED
+                job.finished_at = now
+                logger.error(f"Giving up on billionaire {job.billionaire_id} after {job.attempts} attempts")
+            else:
+                job.status = QUEUED
+                job.available_at = now + timedelta(seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        self.db.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status"""
+        rows = self.db.execute(
+            select(ScrapeJobModel.status, func.count()).group_by(ScrapeJobModel.status)
+        )
+        return {job_status: count for job_status, count in rows}
+
+    def pending(self) -> int:
+        """Jobs still queued or running, including ones waiting out a retry delay"""
+        return self.db.execute(
+            select(func.count()).select_from(ScrapeJobModel).where(ScrapeJobModel.status.in_((QUEUED, RUNNING)))
+        ).scalar()
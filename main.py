@@ -1,26 +1,87 @@
-from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, Request
+from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, Request, Response, Query
 from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List
+from typing import Awaitable, Callable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+import asyncio
 import os
 import sys
 import logging
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 from models import Billionaire, Vote, Report, User
-from database import Database
+from async_database import AsyncDatabase
+from db_config import (
+    READ_YOUR_WRITES_SECONDS,
+    REPLICA_RETRY_SECONDS,
+    create_async_db_engine,
+    create_async_read_router,
+    create_async_session_factory,
+)
 from auth import get_current_active_user, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from utils import calculate_weights
+from utils import calculate_weights, encode_cursor, decode_cursor
+from vote_buffer import VoteBuffer
+from vote_weighting import VOTE_BUCKET_MINUTES, VOTE_WEIGHTING
+from response_cache import CachedResponse, DataVersion, ResponseCache, make_etag, etag_matches
 from scrapers.scraper_manager import ScraperManager
+from job_queue import JobQueue
 from datetime import timedelta
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Billionaire Ranking System")
+def init_db_engine(app: FastAPI):
+    app.state.db_engine = create_async_db_engine()
+    app.state.db_sessions = create_async_session_factory(app.state.db_engine)
+    # GET traffic goes to replicas (or SQLite's read-only pool) when there are any
+    app.state.db_read_router = create_async_read_router(app.state.db_engine)
+
+async def probe_replicas(router):
+    """Re-admit failed replicas once they answer again"""
+    while True:
+        await asyncio.sleep(REPLICA_RETRY_SECONDS)
+        for replica in router.down_replicas():
+            try:
+                async with replica.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+                router.mark_up(replica)
+                logger.info("Read replica is healthy again")
+            except Exception as e:
+                logger.warning(f"Read replica still unavailable: {str(e)}")
+
+async def rerank_as_window_slides():
+    """In window mode weights also change as old buckets leave the window, without any new vote"""
+    while True:
+        await asyncio.sleep(VOTE_BUCKET_MINUTES * 60)
+        try:
+            async with db_session() as db:
+                data_version.set(await db.run_sync(lambda sync_db: sync_db.refresh_ranking_snapshot(calculate_weights(sync_db))))
+        except Exception:
+            logger.exception("Re-ranking for the sliding vote window failed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the pooled async engines once per process and dispose of them on shutdown"""
+    init_db_engine(app)
+    app.state.vote_buffer = VoteBuffer(write_votes)
+    tasks = [asyncio.create_task(probe_replicas(app.state.db_read_router))]
+    if VOTE_WEIGHTING == "window":
+        tasks.append(asyncio.create_task(rerank_as_window_slides()))
+    yield
+    for task in tasks:
+        task.cancel()
+    # Buffered votes must reach the database before the engines go away
+    await app.state.vote_buffer.close()
+    for replica in app.state.db_read_router.replicas:
+        await replica.dispose()
+    await app.state.db_engine.dispose()
+
+app = FastAPI(title="Billionaire Ranking System", lifespan=lifespan)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -29,25 +90,124 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor"],
 )
 
+# Page size bounds for GET /rankings
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 
 # Initialize templates
 templates = Jinja2Templates(directory="templates")
 
-# Create database connection manager for serverless environment
-@contextmanager
-def get_db():
-    db = Database()
-    try:
+@asynccontextmanager
+async def db_session(read_only: bool = False):
+    """AsyncDatabase on a session from the primary's pool, or from a replica's when read_only"""
+    if not hasattr(app.state, "db_sessions"):
+        # Serverless runtimes may skip the lifespan events
+        init_db_engine(app)
+    bind = app.state.db_read_router.choose() if read_only else app.state.db_engine
+    async with app.state.db_sessions(bind=bind) as session:
+        try:
+            yield AsyncDatabase(session)
+        except OperationalError:
+            app.state.db_read_router.mark_down(bind)
+            raise
+
+# Clients that just wrote carry this cookie and read from the primary until it expires
+READ_YOUR_WRITES_COOKIE = "read_your_writes"
+
+def reads_from_primary(request: Request) -> bool:
+    return READ_YOUR_WRITES_COOKIE in request.cookies
+
+def mark_read_your_writes(response: Response):
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE, "1",
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax"
+    )
+
+async def write_votes(votes: List[Vote]):
+    """Persist a batch from the vote buffer, then re-rank once for the whole batch"""
+    async with db_session() as db:
+        await db.save_votes(votes)
+        data_version.set(await db.run_sync(lambda sync_db: sync_db.refresh_ranking_snapshot(calculate_weights(sync_db))))
+    logger.info(f"Wrote a batch of {len(votes)} votes")
+
+def get_vote_buffer() -> VoteBuffer:
+    if not hasattr(app.state, "vote_buffer"):
+        app.state.vote_buffer = VoteBuffer(write_votes)
+    return app.state.vote_buffer
+
+async def get_db():
+    """Request-scoped AsyncDatabase dependency"""
+    async with db_session() as db:
         yield db
-    finally:
-        db.close()
 
 # Create scraper manager instance per request
 def get_scraper_manager():
     return ScraperManager()
 
+async def load_data_version(read_only: bool = True) -> int:
+    async with db_session(read_only=read_only) as db:
+        return await db.get_ranking_version()
+
+# Rendered GET responses are cached per data version, so repeat polling
+# is answered from memory (or with a 304) without touching the database
+data_version = DataVersion(load_data_version)
+response_cache = ResponseCache()
+
+async def cached_response(request: Request, render: Callable[[AsyncDatabase], Awaitable[Response]]) -> Response:
+    """Serve a GET from the response cache, honoring If-None-Match"""
+    if reads_from_primary(request):
+        # Right after a write the TTL-cached (or replica) version may predate it
+        version = await load_data_version(read_only=False)
+        data_version.set(version)
+    else:
+        version = await data_version.get()
+
+    cache_key = f"{request.url.path}?{request.url.query}"
+    etag = make_etag(version, cache_key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    entry = response_cache.get(etag)
+    current = True
+    if entry is None:
+        try:
+            entry, current = await render_entry(request, render, version, etag, read_only=not reads_from_primary(request))
+        except OperationalError:
+            if reads_from_primary(request):
+                raise
+            logger.warning("Read replica failed, retrying on the primary", exc_info=True)
+            entry, current = await render_entry(request, render, version, etag, read_only=False)
+    if not current:
+        # The ETag would vouch for this version, and clients would keep getting 304s for older data
+        headers = {"Cache-Control": "no-store"}
+    return Response(content=entry.body, media_type=entry.media_type, headers={**entry.headers, **headers})
+
+async def render_entry(request: Request, render, version: int, etag: str, read_only: bool) -> Tuple[CachedResponse, bool]:
+    """The rendered response, and whether it was rendered at the version (only then is it cached)"""
+    async with db_session(read_only=read_only) as db:
+        response = await render(db)
+        entry = CachedResponse(
+            body=response.body,
+            media_type=response.media_type,
+            headers={
+                name: value for name, value in response.headers.items()
+                if name not in ("content-length", "content-type")
+            }
+        )
+        # A lagging replica may render older data than the version; serve it but don't cache it
+        current = await db.get_ranking_version() == version
+        if current:
+            response_cache.put(etag, entry)
+        return entry, current
+
 @app.get("/health")
 async def health_check():
     """Simple health check endpoint"""
@@ -56,19 +216,18 @@ async def health_check():
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Render the main rankings page"""
-    try:
-        with get_db() as db:
-            logger.info("Fetching billionaires from database")
-            billionaires = db.get_billionaires()
-            logger.info(f"Retrieved {len(billionaires)} billionaire records")
+    async def render(db: AsyncDatabase):
+        logger.info("Fetching billionaires from database")
+        billionaires = await db.get_ranked_billionaires()
+        logger.info(f"Retrieved {len(billionaires)} billionaire records")
 
-            weights = calculate_weights(db)
-            db.update_billionaire_scores(weights)
+        return templates.TemplateResponse(
+            "rankings.html",
+            {"request": request, "billionaires": billionaires}
+        )
 
-            return templates.TemplateResponse(
-                "rankings.html",
-                {"request": request, "billionaires": sorted(billionaires, key=lambda x: x.overall_score, reverse=True)}
-            )
+    try:
+        return await cached_response(request, render)
     except Exception as e:
         logger.error(f"Error rendering rankings page: {str(e)}")
         return templates.TemplateResponse(
@@ -104,33 +263,80 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     )
 
 @app.get("/rankings", response_model=List[Billionaire])
-async def get_rankings():
-    """Get ranked list of billionaires"""
-    with get_db() as db:
-        billionaires = db.get_billionaires()
-        weights = calculate_weights(db)
-        db.update_billionaire_scores(weights)
-        return sorted(billionaires, key=lambda x: x.overall_score, reverse=True)
+async def get_rankings(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Get ranked list of billionaires from the current ranking snapshot.
+    With limit and/or cursor only one page is returned; the token for the
+    next page is sent in the X-Next-Cursor and Link headers.
+    """
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    async def render(db: AsyncDatabase):
+        if limit is None and cursor is None:
+            billionaires = await db.get_ranked_billionaires()
+            return JSONResponse(jsonable_encoder(billionaires))
+
+        page_size = limit or DEFAULT_PAGE_SIZE
+        # Fetch one extra row to learn whether another page follows
+        billionaires = await db.get_rankings_page(page_size + 1, after)
+        headers = {}
+        if len(billionaires) > page_size:
+            billionaires = billionaires[:page_size]
+            last = billionaires[-1]
+            next_cursor = encode_cursor(last.overall_score, last.id)
+            headers["X-Next-Cursor"] = next_cursor
+            headers["Link"] = f'</rankings?limit={page_size}&cursor={next_cursor}>; rel="next"'
+        return JSONResponse(jsonable_encoder(billionaires), headers=headers)
+
+    return await cached_response(request, render)
 
 @app.get("/billionaire/{billionaire_id}", response_model=Billionaire)
-async def get_billionaire(billionaire_id: str):
+async def get_billionaire(billionaire_id: str, request: Request):
     """Get individual billionaire data"""
-    with get_db() as db:
-        billionaire = db.get_billionaire(billionaire_id)
+    async def render(db: AsyncDatabase):
+        billionaire = await db.get_billionaire(billionaire_id)
         if not billionaire:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Billionaire not found"
             )
-        return billionaire
+        return JSONResponse(jsonable_encoder(billionaire))
+
+    return await cached_response(request, render)
+
+@app.get("/billionaire/{billionaire_id}/rank")
+async def get_billionaire_rank(billionaire_id: str, request: Request):
+    """Get a billionaire's position in the current ranking"""
+    async def render(db: AsyncDatabase):
+        rank = await db.get_rank(billionaire_id)
+        if rank is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Billionaire not found"
+            )
+        return JSONResponse({"billionaire_id": billionaire_id, "rank": rank})
 
-@app.post("/vote")
+    return await cached_response(request, render)
+
+@app.post("/vote", status_code=status.HTTP_202_ACCEPTED)
 async def submit_vote(
     category: str,
     weight: float,
+    response: Response,
     current_user: User = Depends(get_current_active_user)
 ):
-    """Submit a vote for category weights"""
+    """Submit a vote for category weights; it is written with the next batch"""
     if category not in ["social", "environmental", "political", "philanthropy", "cultural"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -143,75 +349,75 @@ async def submit_vote(
             detail="Weight must be between 0 and 1"
         )
 
-    with get_db() as db:
-        vote = Vote(
-            user_id=current_user.username,
-            category=category,
-            weight=weight
-        )
+    vote = Vote(
+        user_id=current_user.username,
+        category=category,
+        weight=weight
+    )
 
-        db.save_vote(vote)
-        weights = calculate_weights(db)
-        db.update_billionaire_scores(weights)
+    await get_vote_buffer().add(vote)
+    mark_read_your_writes(response)
 
-        return {"message": "Vote recorded successfully"}
+    return {"message": "Vote accepted"}
 
 @app.post("/report")
 async def submit_report(
     billionaire_id: str,
     evidence: str,
     category: str,
-    current_user: User = Depends(get_current_active_user)
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """Submit a report about a billionaire"""
-    with get_db() as db:
-        if not db.get_billionaire(billionaire_id):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Billionaire not found"
-            )
-
-        report = Report(
-            user_id=current_user.username,
-            billionaire_id=billionaire_id,
-            evidence=evidence,
-            category=category
+    if not await db.get_billionaire(billionaire_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Billionaire not found"
         )
 
-        db.save_report(report)
-        return {"message": "Report submitted successfully"}
+    report = Report(
+        user_id=current_user.username,
+        billionaire_id=billionaire_id,
+        evidence=evidence,
+        category=category
+    )
+
+    await db.save_report(report)
+    mark_read_your_writes(response)
+    return {"message": "Report submitted successfully"}
 
 @app.post("/update-data/{billionaire_id}")
 async def update_billionaire_data(
     billionaire_id: str,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
     """Trigger data update for a specific billionaire"""
-    with get_db() as db:
-        logger.info(f"Received update request for billionaire {billionaire_id} from user {current_user.username}")
+    logger.info(f"Received update request for billionaire {billionaire_id} from user {current_user.username}")
 
-        if not db.get_billionaire(billionaire_id):
-            logger.error(f"Billionaire {billionaire_id} not found")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Billionaire not found"
-            )
+    if not await db.get_billionaire(billionaire_id):
+        logger.error(f"Billionaire {billionaire_id} not found")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Billionaire not found"
+        )
 
-        scraper_manager = get_scraper_manager()
-        background_tasks.add_task(scraper_manager.update_billionaire_data, billionaire_id)
-        logger.info(f"Started background update task for billionaire {billionaire_id}")
-        return {"message": "Data update started"}
+    scraper_manager = get_scraper_manager()
+    background_tasks.add_task(scraper_manager.update_billionaire_data, billionaire_id)
+    logger.info(f"Started background update task for billionaire {billionaire_id}")
+    return {"message": "Data update started"}
 
 @app.post("/update-all-data")
 async def update_all_data(
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncDatabase = Depends(get_db)
 ):
-    """Trigger data update for all billionaires"""
-    scraper_manager = get_scraper_manager()
-    background_tasks.add_task(scraper_manager.update_all_billionaires)
-    return {"message": "Full data update started"}
+    """Queue a data update for all billionaires; scripts/run_workers.py works through the queue"""
+    queued = await db.run_sync(lambda sync_db: JobQueue(sync_db.db).enqueue())
+    logger.info(f"Queued {queued} update jobs for user {current_user.username}")
+    return {"message": "Full data update queued", "jobs": queued}
 
 # For local development only
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from database_models import Base
-from db_config import DATABASE_URL
+from db_config import DATABASE_URL, IS_SQLITE
 
 config = context.config
 
@@ -23,6 +23,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=IS_SQLITE,
     )
 
     with context.begin_transaction():
@@ -39,7 +40,10 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can only ALTER tables by copying them
+            render_as_batch=IS_SQLITE,
         )
 
         with context.begin_transaction():
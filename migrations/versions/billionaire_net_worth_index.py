@@ -0,0 +1,24 @@
+"""Index billionaires by net worth for the refresh scheduler
+
+Revision ID: billionaire_net_worth_index
+Revises: scrape_job_claim_index
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'billionaire_net_worth_index'
+down_revision = 'scrape_job_claim_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_billionaires_net_worth_id',
+        'billionaires',
+        [sa.text('net_worth DESC'), 'id']
+    )
+
+def downgrade():
+    op.drop_index('ix_billionaires_net_worth_id', table_name='billionaires')
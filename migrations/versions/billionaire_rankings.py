@@ -0,0 +1,35 @@
+"""Add materialized billionaire rankings
+
+Revision ID: billionaire_rankings
+Revises: overall_score_index
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'billionaire_rankings'
+down_revision = 'overall_score_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'billionaire_rankings',
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('billionaire_id', sa.String(), nullable=False),
+        sa.Column('overall_score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['billionaire_id'], ['billionaires.id'], ),
+        sa.PrimaryKeyConstraint('rank'),
+        sa.UniqueConstraint('billionaire_id')
+    )
+
+    # Rank the scores already stored so reads work before the next recompute
+    op.execute(
+        "INSERT INTO billionaire_rankings (rank, billionaire_id, overall_score) "
+        "SELECT ROW_NUMBER() OVER (ORDER BY overall_score DESC, id), id, overall_score "
+        "FROM billionaires"
+    )
+
+def downgrade():
+    op.drop_table('billionaire_rankings')
@@ -0,0 +1,50 @@
+"""Add companies linked to billionaires, and per-company scrape results
+
+Revision ID: company_entities
+Revises: scrape_job_priority
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'company_entities'
+down_revision = 'scrape_job_priority'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'companies',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table(
+        'billionaire_companies',
+        sa.Column('billionaire_id', sa.String(), nullable=False),
+        sa.Column('company_id', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['billionaire_id'], ['billionaires.id']),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('billionaire_id', 'company_id')
+    )
+    op.create_index('ix_billionaire_companies_company_id', 'billionaire_companies', ['company_id'])
+    op.create_table(
+        'company_scrape_results',
+        sa.Column('company_id', sa.String(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.Column('scores', sa.JSON(), nullable=False),
+        sa.Column('raw_text', sa.LargeBinary(), nullable=True),
+        sa.Column('body_hash', sa.String(length=64), nullable=True),
+        sa.Column('text_hash', sa.String(length=64), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('company_id', 'source')
+    )
+
+def downgrade():
+    op.drop_table('company_scrape_results')
+    op.drop_index('ix_billionaire_companies_company_id', table_name='billionaire_companies')
+    op.drop_table('billionaire_companies')
+    op.drop_table('companies')
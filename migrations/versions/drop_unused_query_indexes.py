@@ -0,0 +1,24 @@
+"""Drop indexes that no query uses
+
+Revision ID: drop_unused_query_indexes
+Revises: billionaire_net_worth_index
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = 'drop_unused_query_indexes'
+down_revision = 'billionaire_net_worth_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Weights come from vote_aggregates, and the aggregate rebuild reads every vote anyway
+    op.drop_index('ix_votes_category_weight', table_name='votes')
+    op.drop_index('ix_votes_timestamp', table_name='votes')
+    op.drop_index('ix_reports_status_timestamp', table_name='reports')
+
+def downgrade():
+    op.create_index('ix_reports_status_timestamp', 'reports', ['status', 'timestamp'])
+    op.create_index('ix_votes_timestamp', 'votes', ['timestamp'])
+    op.create_index('ix_votes_category_weight', 'votes', ['category', 'weight'])
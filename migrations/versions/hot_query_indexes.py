@@ -0,0 +1,27 @@
+"""Add indexes for the hot vote and report queries
+
+Revision ID: hot_query_indexes
+Revises: billionaire_rankings
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = 'hot_query_indexes'
+down_revision = 'billionaire_rankings'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_votes_category_weight', 'votes', ['category', 'weight'])
+    op.create_index('ix_votes_user_id_category', 'votes', ['user_id', 'category'])
+    op.create_index('ix_votes_timestamp', 'votes', ['timestamp'])
+    op.create_index('ix_reports_billionaire_id_status', 'reports', ['billionaire_id', 'status'])
+    op.create_index('ix_reports_status_timestamp', 'reports', ['status', 'timestamp'])
+
+def downgrade():
+    op.drop_index('ix_reports_status_timestamp', table_name='reports')
+    op.drop_index('ix_reports_billionaire_id_status', table_name='reports')
+    op.drop_index('ix_votes_timestamp', table_name='votes')
+    op.drop_index('ix_votes_user_id_category', table_name='votes')
+    op.drop_index('ix_votes_category_weight', table_name='votes')
@@ -0,0 +1,40 @@
+"""Keep only the latest vote per user and category
+
+Revision ID: latest_vote_per_user
+Revises: vote_weighting
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = 'latest_vote_per_user'
+down_revision = 'vote_weighting'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # The most recently inserted vote is the one that stays in effect
+    op.execute(
+        "DELETE FROM votes WHERE id NOT IN ("
+        "SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, category ORDER BY id DESC) AS position "
+        "FROM votes"
+        ") ranked WHERE position = 1)"
+    )
+
+    op.drop_index('ix_votes_user_id_category', table_name='votes')
+    op.create_index('ix_votes_user_id_category', 'votes', ['user_id', 'category'], unique=True)
+
+    # Bring the aggregates in line with the surviving votes; decayed and windowed
+    # totals are refreshed with their real ages by scripts/rebuild_vote_aggregates.py
+    op.execute(
+        "UPDATE vote_aggregates SET "
+        "weight_sum = (SELECT COALESCE(SUM(weight), 0) FROM votes WHERE votes.category = vote_aggregates.category), "
+        "vote_count = (SELECT COUNT(id) FROM votes WHERE votes.category = vote_aggregates.category)"
+    )
+    op.execute("UPDATE vote_aggregates SET decayed_sum = weight_sum, decayed_count = vote_count, decay_epoch = NULL")
+    op.execute("DELETE FROM vote_buckets")
+
+def downgrade():
+    op.drop_index('ix_votes_user_id_category', table_name='votes')
+    op.create_index('ix_votes_user_id_category', 'votes', ['user_id', 'category'])
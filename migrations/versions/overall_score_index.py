@@ -0,0 +1,24 @@
+"""Index billionaires by overall score for keyset pagination
+
+Revision ID: overall_score_index
+Revises: ranking_snapshot
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'overall_score_index'
+down_revision = 'ranking_snapshot'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_billionaires_overall_score_id',
+        'billionaires',
+        [sa.text('overall_score DESC'), 'id']
+    )
+
+def downgrade():
+    op.drop_index('ix_billionaires_overall_score_id', table_name='billionaires')
@@ -0,0 +1,27 @@
+"""Add versioned ranking snapshot
+
+Revision ID: ranking_snapshot
+Revises: vote_aggregates
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'ranking_snapshot'
+down_revision = 'vote_aggregates'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'ranking_snapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('weights', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade():
+    op.drop_table('ranking_snapshot')
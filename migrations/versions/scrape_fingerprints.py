@@ -0,0 +1,24 @@
+"""Fingerprint scraped pages to skip re-parsing unchanged ones
+
+Revision ID: scrape_fingerprints
+Revises: scrape_results
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'scrape_fingerprints'
+down_revision = 'scrape_results'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('scrape_results') as batch_op:
+        batch_op.add_column(sa.Column('body_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('text_hash', sa.String(length=64), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('scrape_results') as batch_op:
+        batch_op.drop_column('text_hash')
+        batch_op.drop_column('body_hash')
@@ -0,0 +1,26 @@
+"""Index queued scrape jobs in claim order
+
+Revision ID: scrape_job_claim_index
+Revises: company_entities
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'scrape_job_claim_index'
+down_revision = 'company_entities'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.drop_index('ix_scrape_jobs_status_available_at', table_name='scrape_jobs')
+    op.create_index(
+        'ix_scrape_jobs_status_priority_available_at',
+        'scrape_jobs',
+        ['status', sa.text('priority DESC'), 'available_at']
+    )
+
+def downgrade():
+    op.drop_index('ix_scrape_jobs_status_priority_available_at', table_name='scrape_jobs')
+    op.create_index('ix_scrape_jobs_status_available_at', 'scrape_jobs', ['status', 'available_at'])
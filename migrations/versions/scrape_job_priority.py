@@ -0,0 +1,24 @@
+"""Prioritize scrape jobs and record how much each run changed the scores
+
+Revision ID: scrape_job_priority
+Revises: scrape_jobs
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'scrape_job_priority'
+down_revision = 'scrape_jobs'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('scrape_jobs') as batch_op:
+        batch_op.add_column(sa.Column('priority', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('score_change', sa.Float(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table('scrape_jobs') as batch_op:
+        batch_op.drop_column('score_change')
+        batch_op.drop_column('priority')
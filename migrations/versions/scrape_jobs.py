@@ -0,0 +1,36 @@
+"""Add a durable queue of scrape jobs
+
+Revision ID: scrape_jobs
+Revises: scrape_fingerprints
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'scrape_jobs'
+down_revision = 'scrape_fingerprints'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'scrape_jobs',
+        sa.Column('billionaire_id', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('lease_token', sa.String(), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('enqueued_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['billionaire_id'], ['billionaires.id']),
+        sa.PrimaryKeyConstraint('billionaire_id')
+    )
+    op.create_index('ix_scrape_jobs_status_available_at', 'scrape_jobs', ['status', 'available_at'])
+    op.create_index('ix_scrape_jobs_lease_token', 'scrape_jobs', ['lease_token'])
+
+def downgrade():
+    op.drop_index('ix_scrape_jobs_lease_token', table_name='scrape_jobs')
+    op.drop_index('ix_scrape_jobs_status_available_at', table_name='scrape_jobs')
+    op.drop_table('scrape_jobs')
@@ -0,0 +1,29 @@
+"""Store the latest scrape of each source per billionaire
+
+Revision ID: scrape_results
+Revises: latest_vote_per_user
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'scrape_results'
+down_revision = 'latest_vote_per_user'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'scrape_results',
+        sa.Column('billionaire_id', sa.String(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.Column('scores', sa.JSON(), nullable=False),
+        sa.Column('raw_text', sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(['billionaire_id'], ['billionaires.id']),
+        sa.PrimaryKeyConstraint('billionaire_id', 'source')
+    )
+
+def downgrade():
+    op.drop_table('scrape_results')
@@ -0,0 +1,42 @@
+"""Add per-category vote aggregates
+
+Revision ID: vote_aggregates
+Revises: initial_migration
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'vote_aggregates'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+CATEGORIES = ['social', 'environmental', 'political', 'philanthropy', 'cultural']
+
+def upgrade():
+    op.create_table(
+        'vote_aggregates',
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('weight_sum', sa.Float(), nullable=False),
+        sa.Column('vote_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('category')
+    )
+
+    # Seed one row per category so concurrent first votes only ever UPDATE
+    op.execute(
+        "INSERT INTO vote_aggregates (category, weight_sum, vote_count) "
+        "SELECT category, SUM(weight), COUNT(id) FROM votes GROUP BY category"
+    )
+    for category in CATEGORIES:
+        op.execute(
+            sa.text(
+                "INSERT INTO vote_aggregates (category, weight_sum, vote_count) "
+                "SELECT :category, 0, 0 WHERE NOT EXISTS "
+                "(SELECT 1 FROM vote_aggregates WHERE category = :category)"
+            ).bindparams(category=category)
+        )
+
+def downgrade():
+    op.drop_table('vote_aggregates')
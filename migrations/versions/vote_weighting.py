@@ -0,0 +1,39 @@
+"""Add decayed vote aggregates and time-bucketed vote totals
+
+Revision ID: vote_weighting
+Revises: hot_query_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'vote_weighting'
+down_revision = 'hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('vote_aggregates') as batch_op:
+        batch_op.add_column(sa.Column('decayed_sum', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('decayed_count', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('decay_epoch', sa.DateTime(), nullable=True))
+
+    # Existing votes start out undecayed; scripts/rebuild_vote_aggregates.py applies their real ages
+    op.execute("UPDATE vote_aggregates SET decayed_sum = weight_sum, decayed_count = vote_count")
+
+    op.create_table(
+        'vote_buckets',
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('weight_sum', sa.Float(), nullable=False),
+        sa.Column('vote_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket_start', 'category')
+    )
+
+def downgrade():
+    op.drop_table('vote_buckets')
+    with op.batch_alter_table('vote_aggregates') as batch_op:
+        batch_op.drop_column('decay_epoch')
+        batch_op.drop_column('decayed_count')
+        batch_op.drop_column('decayed_sum')
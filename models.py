@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from typing import List, Optional
 from datetime import datetime
+from scoring import DEFAULT_WEIGHTS
 
 class Billionaire(BaseModel):
     id: str
@@ -11,12 +12,13 @@ class Billionaire(BaseModel):
     political_score: float = Field(..., ge=0, le=20)
     philanthropy_score: float = Field(..., ge=0, le=20)
     cultural_score: float = Field(..., ge=0, le=10)
-    overall_score: float = 0
+    overall_score: Optional[float] = None
 
     @validator('overall_score', pre=True, always=True)
     def calculate_overall_score(cls, v, values):
         """
-        Calculate overall score with weights based on:
+        Keep the overall score from the ranking snapshot when one is given,
+        otherwise calculate it with the default weights based on:
         - Social impact (30%): Worker treatment, tax practices, governance
         - Environmental responsibility (20%): Climate action, sustainability
         - Political influence (20%): Campaign contributions, lobbying transparency
@@ -28,13 +30,10 @@ class Billionaire(BaseModel):
         - Medium scores (8-15): Neutral to moderate positive impact
         - Low scores (<8): Negative impact, needs improvement
         """
-        weights = {
-            'social': 0.3,
-            'environmental': 0.2,
-            'political': 0.2,
-            'philanthropy': 0.2,
-            'cultural': 0.1
-        }
+        if v is not None:
+            return v
+
+        weights = DEFAULT_WEIGHTS
 
         return (
             values.get('social_score', 0) * weights['social'] +
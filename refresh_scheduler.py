@@ -0,0 +1,194 @@
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from collections import defaultdict
+from database import Database
+from database_models import BillionaireModel, ReportModel, ScrapeJobModel, ScrapeResultModel
+from job_queue import JobQueue, DONE, FAILED
+from scrapers.base_scraper import BaseScraper
+from datetime import datetime, timedelta
+import heapq
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default request budget per source and hour; SCHEDULER_SOURCE_BUDGETS overrides single
+# sources, e.g. "sec=360,glassdoor=120" (keys as in ScraperManager.scrapers)
+SCHEDULER_REQUESTS_PER_HOUR = float(os.environ.get("SCHEDULER_REQUESTS_PER_HOUR", "600"))
+SCHEDULER_SOURCE_BUDGETS = os.environ.get("SCHEDULER_SOURCE_BUDGETS", "")
+# How often the scheduler tops up the queue
+SCHEDULER_TICK_SECONDS = float(os.environ.get("SCHEDULER_TICK_SECONDS", "60"))
+# No new jobs while this many are still waiting, so a slow worker pool is not buried
+SCHEDULER_MAX_QUEUED = int(os.environ.get("SCHEDULER_MAX_QUEUED", "500"))
+# Billionaires refreshed more recently than this are not rescheduled
+SCHEDULER_MIN_AGE_HOURS = float(os.environ.get("SCHEDULER_MIN_AGE_HOURS", "6"))
+# Staleness assumed for billionaires with a source that was never scraped
+SCHEDULER_NEVER_SCRAPED_HOURS = float(os.environ.get("SCHEDULER_NEVER_SCRAPED_HOURS", "720"))
+# Reports filed within this window count as recent activity
+SCHEDULER_REPORT_WINDOW_DAYS = float(os.environ.get("SCHEDULER_REPORT_WINDOW_DAYS", "7"))
+# How strongly net-worth rank, recent reports and the last score change speed up aging
+SCHEDULER_RANK_WEIGHT = float(os.environ.get("SCHEDULER_RANK_WEIGHT", "4"))
+SCHEDULER_REPORT_WEIGHT = float(os.environ.get("SCHEDULER_REPORT_WEIGHT", "1"))
+SCHEDULER_CHANGE_WEIGHT = float(os.environ.get("SCHEDULER_CHANGE_WEIGHT", "0.5"))
+
+def parse_budgets(spec: str) -> Dict[str, float]:
+    """"sec=360,glassdoor=120" -> {"sec": 360.0, "glassdoor": 120.0}"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        source, _, budget = item.partition("=")
+        budgets[source.strip()] = float(budget)
+    return budgets
+
+def refresh_priority(staleness_hours: float, rank: int, recent_reports: int, score_change: Optional[float]) -> float:
+    """
+    Staleness scaled by importance: every billionaire ages, but the richest,
+    the recently reported and the ones whose scores moved last time age faster.
+    rank is the net-worth rank, starting at 1.
+    """
+    importance = 1 / math.log2(rank + 1)
+    return staleness_hours * (
+        1
+        + SCHEDULER_RANK_WEIGHT * importance
+        + SCHEDULER_REPORT_WEIGHT * math.log1p(recent_reports)
+        + SCHEDULER_CHANGE_WEIGHT * (score_change or 0)
+    )
+
+class RefreshScheduler:
+    """
+    Keeps the job queue topped up with the billionaires most in need of a
+    refresh. Each tick it ranks the billionaires that are due by
+    refresh_priority() and queues as many of the best as the tightest
+    per-source request budget allows. A billionaire's refresh costs each
+    source its page count; a company-scoped source instead costs its page
+    count per linked company, and nothing for a company that a billionaire
+    queued earlier in the tick already covers. Budgets refill continuously
+    (a token bucket per source), so the top of the ranking stays fresh
+    without full sweeps.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        scrapers: Dict[str, BaseScraper],
+        budgets: Optional[Dict[str, float]] = None,
+        tick_seconds: float = SCHEDULER_TICK_SECONDS
+    ):
+        self.db = session
+        self.queue = JobQueue(session)
+        budgets = {**{source: SCHEDULER_REQUESTS_PER_HOUR for source in scrapers}, **(budgets or {})}
+        # Requests one scrape of each source costs (of a billionaire, or of a company), and each source's refill per second
+        self.pages = {source: len(scraper.build_urls("")) for source, scraper in scrapers.items()}
+        self.company_scoped = {source for source, scraper in scrapers.items() if scraper.company_scoped}
+        self.rates = {source: budgets[source] / 3600 for source in scrapers}
+        # Room for two ticks' worth, and always for at least one scrape
+        self.capacity = {
+            source: max(2 * self.rates[source] * tick_seconds, self.pages[source]) for source in scrapers
+        }
+        self.tokens = {source: 0.0 for source in scrapers}
+        self._refilled_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        for source, rate in self.rates.items():
+            self.tokens[source] = min(self.capacity[source], self.tokens[source] + rate * elapsed)
+
+    def costs(self, companies: List[str], covered: Dict[str, Set[str]]) -> Dict[str, int]:
+        """
+        Requests a billionaire's refresh costs each source, given its linked
+        company IDs and the companies already covered per source this tick
+        """
+        costs = {}
+        for source, pages in self.pages.items():
+            if source in self.company_scoped and companies:
+                costs[source] = pages * len(set(companies) - covered[source])
+            else:
+                costs[source] = pages
+        return costs
+
+    def candidates(self, now: datetime) -> Iterator[Tuple[float, str]]:
+        """
+        (priority, billionaire_id) of every billionaire that is due: never
+        queued, or whose last job finished (or failed) SCHEDULER_MIN_AGE_HOURS
+        ago or more. Every billionaire is ranked by net worth in one walk of
+        ix_billionaires_net_worth_id; scrape results and reports are only
+        looked up for the due ones.
+        """
+        ranked = select(
+            BillionaireModel.id,
+            func.row_number().over(order_by=(BillionaireModel.net_worth.desc(), BillionaireModel.id)).label("rank")
+        ).subquery()
+        oldest = (
+            select(func.min(ScrapeResultModel.fetched_at))
+            .where(ScrapeResultModel.billionaire_id == ranked.c.id)
+            .scalar_subquery()
+        )
+        sources = (
+            select(func.count())
+            .select_from(ScrapeResultModel)
+            .where(ScrapeResultModel.billionaire_id == ranked.c.id)
+            .scalar_subquery()
+        )
+        reports = (
+            select(func.count())
+            .select_from(ReportModel)
+            .where(
+                ReportModel.billionaire_id == ranked.c.id,
+                ReportModel.timestamp >= now - timedelta(days=SCHEDULER_REPORT_WINDOW_DAYS)
+            )
+            .scalar_subquery()
+        )
+        rows = self.db.execute(
+            select(ranked.c.id, ranked.c.rank, oldest, sources, reports, ScrapeJobModel.score_change)
+            .outerjoin(ScrapeJobModel, ScrapeJobModel.billionaire_id == ranked.c.id)
+            .where(or_(
+                ScrapeJobModel.billionaire_id.is_(None),
+                and_(
+                    ScrapeJobModel.status.in_((DONE, FAILED)),
+                    ScrapeJobModel.finished_at <= now - timedelta(hours=SCHEDULER_MIN_AGE_HOURS)
+                )
+            ))
+            .execution_options(yield_per=1000)
+        )
+        for billionaire_id, rank, oldest, sources, recent_reports, score_change in rows:
+            if oldest is None or sources < len(self.pages):
+                staleness_hours = SCHEDULER_NEVER_SCRAPED_HOURS
+            else:
+                staleness_hours = (now - oldest).total_seconds() / 3600
+            # Also refreshed outside the queue, e.g. through POST /update-data
+            if staleness_hours < SCHEDULER_MIN_AGE_HOURS:
+                continue
+            yield refresh_priority(staleness_hours, rank, recent_reports or 0, score_change), billionaire_id
+
+    def tick(self) -> int:
+        """Queue the highest-priority billionaires the budget allows; returns how many were queued"""
+        if self.queue.pending() >= SCHEDULER_MAX_QUEUED:
+            self.db.rollback()
+            return 0
+        self._refill()
+        best = heapq.nlargest(SCHEDULER_MAX_QUEUED, self.candidates(datetime.utcnow()))
+        links = Database(self.db).get_billionaire_companies([billionaire_id for _, billionaire_id in best])
+        covered: Dict[str, Set[str]] = defaultdict(set)
+        chosen = []
+        for priority, billionaire_id in best:
+            companies = [key for key, _ in links.get(billionaire_id, [])]
+            costs = self.costs(companies, covered)
+            # Stop at the first one the tightest budget can't cover; a cost beyond a
+            # bucket's capacity is let through once the bucket is full
+            if any(self.tokens[source] < min(cost, self.capacity[source]) for source, cost in costs.items() if cost):
+                break
+            for source, cost in costs.items():
+                self.tokens[source] -= cost
+            for source in self.company_scoped:
+                covered[source].update(companies)
+            chosen.append((priority, billionaire_id))
+        if not chosen:
+            self.db.rollback()
+            return 0
+        scheduled = self.queue.schedule({billionaire_id: priority for priority, billionaire_id in chosen})
+        logger.info(f"Scheduled {scheduled} refreshes, priorities {chosen[0][0]:.1f} to {chosen[-1][0]:.1f}")
+        return scheduled
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+import hashlib
+import os
+import threading
+import time
+
+# How long a worker trusts its cached data version before re-reading it from the database
+DATA_VERSION_TTL_SECONDS = float(os.environ.get("DATA_VERSION_TTL_SECONDS", "2"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "256"))
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+class DataVersion:
+    """
+    Process-local copy of the data version (the ranking snapshot version).
+    The database is consulted at most once per TTL; writes made by this
+    process publish their new version immediately through set().
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[int]], ttl: float = DATA_VERSION_TTL_SECONDS):
+        self._loader = loader
+        self._ttl = ttl
+        self._version: Optional[int] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    async def get(self) -> int:
+        now = time.monotonic()
+        if self._version is not None and now - self._loaded_at < self._ttl:
+            return self._version
+        version = await self._loader()
+        self.set(version, now)
+        return self._version
+
+    def set(self, version: int, loaded_at: Optional[float] = None):
+        with self._lock:
+            # The version only ever moves forward, even if a stale read races a local write
+            if self._version is None or version >= self._version:
+                self._version = version
+            self._loaded_at = time.monotonic() if loaded_at is None else loaded_at
+
+class ResponseCache:
+    """Size-bounded LRU of rendered response bodies keyed by ETag"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+def make_etag(version: int, key: str) -> str:
+    """
+    Strong ETag for a resource at a data version. Responses are rendered
+    deterministically from the data, so equal versions mean identical bytes.
+    """
+    digest = hashlib.sha256(f"{version}:{key}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so a W/ prefix on the client's tag is ignored"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
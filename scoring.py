@@ -0,0 +1,9 @@
+CATEGORIES = ('social', 'environmental', 'political', 'philanthropy', 'cultural')
+
+DEFAULT_WEIGHTS = {
+    'social': 0.3,
+    'environmental': 0.2,
+    'political': 0.2,
+    'philanthropy': 0.2,
+    'cultural': 0.1
+}
@@ -1,20 +1,138 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional, Type
+import asyncio
+import hashlib
 import trafilatura
 from datetime import datetime
+from .fetcher import AsyncFetcher, SCRAPER_REQUESTS_PER_SECOND
+from .http_cache import SCRAPER_CACHE_TTL_SECONDS
+
+class PageFingerprint(NamedTuple):
+    """Hashes of a source's pages from the last scrape, and the scores they produced"""
+    body_hash: Optional[str]
+    text_hash: Optional[str]
+    scores: Dict[str, float]
+
+def _pages_hash(pages: Dict[str, Optional[str]]) -> Optional[str]:
+    """Fingerprint of a set of pages, or None if one failed to download: a failure is never unchanged"""
+    if any(page is None for page in pages.values()):
+        return None
+    digest = hashlib.sha256()
+    for name in sorted(pages):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update(pages[name].encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
 
 class BaseScraper(ABC):
+    # Set by each scraper: the exception raised when scraping fails, and the source's display name
+    error_class: Type[Exception] = Exception
+    source = ""
+    # How long a fetched page of this source is reused before it is revalidated
+    cache_ttl = SCRAPER_CACHE_TTL_SECONDS
+    # Requests per second the source tolerates (SCRAPER_HOST_RATES overrides it per host)
+    requests_per_second = SCRAPER_REQUESTS_PER_SECOND
+    # Whether the source reports on companies; these are scraped once per linked company, not per billionaire
+    company_scoped = False
+
     def __init__(self):
         self.last_updated = datetime.now()
 
     @abstractmethod
-    def get_data(self, identifier: str) -> Dict[str, Any]:
-        """Get data for a specific billionaire"""
+    def build_urls(self, identifier: str) -> Dict[str, str]:
+        """Pages to fetch for a billionaire, keyed by the name score() expects"""
         pass
 
+    @abstractmethod
+    def score(self, pages: Dict[str, str]) -> Dict[str, Any]:
+        """Scores from the extracted text of each page"""
+        pass
+
+    def get_data(self, identifier: str) -> Dict[str, Any]:
+        """Get data for a specific billionaire, fetching the pages one after another"""
+        try:
+            pages = {name: self.extract_text_content(url) for name, url in self.build_urls(identifier).items()}
+            return self.score(pages)
+        except Exception as e:
+            raise self.error_class(f"Failed to scrape {self.source} data: {str(e)}")
+
+    async def get_data_async(
+        self, identifier: str, fetcher: AsyncFetcher, previous: Optional[PageFingerprint] = None
+    ) -> Dict[str, Any]:
+        """Get data for a specific billionaire, fetching all of its pages concurrently"""
+        downloads = await self.fetch_pages(identifier, fetcher)
+        reused = self.reuse_unchanged(downloads, previous)
+        if reused is not None:
+            return reused
+        # Parsing is CPU-bound; keep it off the event loop
+        return await asyncio.to_thread(self.score_downloads, downloads, previous)
+
+    async def fetch_pages(self, identifier: str, fetcher: AsyncFetcher) -> Dict[str, str]:
+        """Download every page of a billionaire concurrently; fails if any page could not be downloaded"""
+        try:
+            urls = self.build_urls(identifier)
+            downloads = await asyncio.gather(*(fetcher.fetch(url, self.cache_ttl, self.requests_per_second) for url in urls.values()))
+        except Exception as e:
+            raise self.error_class(f"Failed to scrape {self.source} data: {str(e)}")
+        pages = dict(zip(urls, downloads))
+        self.check_downloads(pages)
+        return pages
+
+    def check_downloads(self, downloads: Dict[str, Optional[str]]):
+        """
+        Raise the source's error if a page failed to download. A missing page
+        would otherwise be scored as empty text, i.e. the neutral base scores,
+        and overwrite the billionaire's real ones.
+        """
+        failed = sorted(name for name, html in downloads.items() if html is None)
+        if failed:
+            raise self.error_class(f"Failed to scrape {self.source} data: could not download {', '.join(failed)}")
+
+    def reuse_unchanged(
+        self, downloads: Dict[str, Optional[str]], previous: Optional[PageFingerprint]
+    ) -> Optional[Dict[str, Any]]:
+        """The previous scores if the downloaded pages are byte-for-byte unchanged, else None"""
+        if previous is None or previous.body_hash is None:
+            return None
+        body_hash = _pages_hash(downloads)
+        if body_hash is None or body_hash != previous.body_hash:
+            return None
+        return {**previous.scores, "body_hash": body_hash, "text_hash": previous.text_hash, "skipped": "extraction"}
+
+    def score_downloads(
+        self, downloads: Dict[str, str], previous: Optional[PageFingerprint] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract the text of downloaded pages and score it; picklable, so it can
+        run in a worker process. Given the previous fingerprint, unchanged pages
+        skip extraction and unchanged text skips scoring.
+        """
+        self.check_downloads(downloads)
+        try:
+            reused = self.reuse_unchanged(downloads, previous)
+            if reused is not None:
+                return reused
+            pages = {name: self.extract_text(html) for name, html in downloads.items()}
+            text_hash = _pages_hash(pages)
+            if previous is not None and previous.text_hash == text_hash:
+                # Same text under new markup; raw_data is left out so the stored text is kept
+                data = {**previous.scores, "skipped": "scoring"}
+            else:
+                data = {**self.score(pages), "skipped": None}
+            data["body_hash"] = _pages_hash(downloads)
+            data["text_hash"] = text_hash
+            return data
+        except Exception as e:
+            raise self.error_class(f"Failed to scrape {self.source} data: {str(e)}")
+
     def extract_text_content(self, url: str) -> str:
         """Extract clean text content from a webpage"""
-        downloaded = trafilatura.fetch_url(url)
+        return self.extract_text(trafilatura.fetch_url(url))
+
+    @staticmethod
+    def extract_text(downloaded: Optional[str]) -> str:
+        """Extract clean text content from a downloaded page"""
         if downloaded:
             return trafilatura.extract(downloaded) or ""
         return ""
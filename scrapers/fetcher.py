@@ -0,0 +1,155 @@
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import logging
+import os
+import time
+import httpx
+from .http_cache import HttpCache, SCRAPER_CACHE_TTL_SECONDS
+from .rate_limit import HostThrottle, SCRAPER_MAX_RETRIES, backoff_delay, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Concurrency limits for a refresh: across all hosts, and per host so no source is hammered
+SCRAPER_MAX_CONNECTIONS = int(os.environ.get("SCRAPER_MAX_CONNECTIONS", "64"))
+SCRAPER_PER_HOST_CONNECTIONS = int(os.environ.get("SCRAPER_PER_HOST_CONNECTIONS", "4"))
+SCRAPER_TIMEOUT_SECONDS = float(os.environ.get("SCRAPER_TIMEOUT_SECONDS", "30"))
+SCRAPER_USER_AGENT = os.environ.get("SCRAPER_USER_AGENT", "Mozilla/5.0 (compatible; billionaire-index/0.1)")
+SCRAPER_CACHE_ENABLED = os.environ.get("SCRAPER_CACHE_ENABLED", "true").lower() == "true"
+# Requests per second to a host unless its scraper or SCRAPER_HOST_RATES says otherwise
+SCRAPER_REQUESTS_PER_SECOND = float(os.environ.get("SCRAPER_REQUESTS_PER_SECOND", "2"))
+# Per-host overrides, e.g. "www.sec.gov=10,www.glassdoor.com=0.5"
+SCRAPER_HOST_RATES = os.environ.get("SCRAPER_HOST_RATES", "")
+# Processes scraping side by side (e.g. scrape workers); each one paces every host at its share of the rate
+SCRAPER_RATE_SHARES = int(os.environ.get("SCRAPER_RATE_SHARES", "1"))
+
+# Answers that mean the host wants us to slow down, and ones worth retrying
+OVERLOAD_STATUSES = {429, 503}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def parse_host_rates(spec: str) -> Dict[str, float]:
+    """"www.sec.gov=10,www.glassdoor.com=0.5" -> {"www.sec.gov": 10.0, "www.glassdoor.com": 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, rate = item.partition("=")
+        rates[host.strip()] = float(rate)
+    return rates
+
+class AsyncFetcher:
+    """
+    Shared HTTP client for scrapers. Connections are pooled and kept alive
+    across requests; a global semaphore bounds how many requests are in
+    flight, and a HostThrottle per host paces them and adapts its
+    concurrency to how the host copes. Overloaded and failed requests are
+    retried with jittered backoff. Responses go through the on-disk HttpCache.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = SCRAPER_MAX_CONNECTIONS,
+        per_host: int = SCRAPER_PER_HOST_CONNECTIONS,
+        timeout: float = SCRAPER_TIMEOUT_SECONDS,
+        cache: Optional[HttpCache] = None,
+        cache_enabled: bool = SCRAPER_CACHE_ENABLED,
+        host_rates: Optional[Dict[str, float]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rate_shares: int = SCRAPER_RATE_SHARES
+    ):
+        # Pass a cache explicitly, or leave it to cache_enabled
+        self._owns_cache = cache is None and cache_enabled
+        self.cache = HttpCache() if self._owns_cache else cache
+        # A transport replaces the network, e.g. a replay of recorded fixtures
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            follow_redirects=True,
+            headers={"User-Agent": SCRAPER_USER_AGENT},
+            transport=transport
+        )
+        self._slots = asyncio.Semaphore(max_connections)
+        self._per_host = per_host
+        self._host_rates = parse_host_rates(SCRAPER_HOST_RATES) if host_rates is None else host_rates
+        self._rate_shares = max(1, rate_shares)
+        self._throttles: Dict[str, HostThrottle] = {}
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self._client.aclose()
+        if self.cache:
+            logger.info(f"Scraper cache: {self.cache.stats}, hit rate {self.cache.hit_rate():.0%}")
+        if self._owns_cache:
+            self.cache.close()
+
+    def throttle(self, url: str, rate: Optional[float] = None) -> HostThrottle:
+        """The host's throttle; its rate is fixed by SCRAPER_HOST_RATES or the first caller, split between rate_shares"""
+        host = urlsplit(url).netloc
+        if host not in self._throttles:
+            rate = self._host_rates.get(host, rate or SCRAPER_REQUESTS_PER_SECOND) / self._rate_shares
+            self._throttles[host] = HostThrottle(rate, self._per_host)
+        return self._throttles[host]
+
+    async def fetch(
+        self, url: str, ttl: float = SCRAPER_CACHE_TTL_SECONDS, rate: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Body of a successful GET, or None (like trafilatura.fetch_url) when the
+        request fails. Cached bodies younger than ttl are returned without a
+        request; older ones are revalidated with their ETag/Last-Modified.
+        rate: requests per second the source allows
+        """
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+        if cached is not None and cached.is_fresh(ttl):
+            self.cache.record("hits")
+            return cached.body
+
+        headers = cached.validators() if cached is not None else {}
+        response = await self._get(url, headers, self.throttle(url, rate))
+        if response is None:
+            return None
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.record("revalidated")
+            await asyncio.to_thread(self.cache.touch, url)
+            return cached.body
+        if response.status_code != 200:
+            logger.warning(f"Fetching {url} returned HTTP {response.status_code}")
+            return None
+        if self.cache:
+            self.cache.record("misses")
+            await asyncio.to_thread(
+                self.cache.put, url, response.text,
+                response.headers.get("etag"), response.headers.get("last-modified")
+            )
+        return response.text
+
+    async def _get(self, url: str, headers: Dict[str, str], throttle: HostThrottle) -> Optional[httpx.Response]:
+        """GET through the host's throttle, retrying overloads and transient failures"""
+        for attempt in range(SCRAPER_MAX_RETRIES + 1):
+            retry_after = None
+            # The host's turn first, so waiting on a slow host does not hold a global slot
+            async with throttle, self._slots:
+                started = time.monotonic()
+                try:
+                    response = await self._client.get(url, headers=headers)
+                except httpx.HTTPError as e:
+                    # Timeouts and refused connections are a sign of overload too
+                    throttle.on_overload()
+                    logger.warning(f"Fetching {url} failed (attempt {attempt + 1}): {str(e)}")
+                    response = None
+                else:
+                    if response.status_code in OVERLOAD_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get("retry-after"))
+                        throttle.on_overload(retry_after)
+                    else:
+                        throttle.on_success(time.monotonic() - started)
+                    if response.status_code not in RETRY_STATUSES:
+                        return response
+                    logger.warning(f"Fetching {url} returned HTTP {response.status_code} (attempt {attempt + 1})")
+            if attempt < SCRAPER_MAX_RETRIES:
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+        return response
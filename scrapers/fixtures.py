@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+import random
+import httpx
+
+# Where recorded and synthetic responses are kept
+SCRAPER_FIXTURES_DIR = os.environ.get("SCRAPER_FIXTURES_DIR", "data/fixtures")
+
+# Response headers worth keeping in a fixture
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+FILLER = (
+    "the report reviewed public filings statements and news coverage about the company and its "
+    "founder including annual results board decisions hiring plans product launches and investments"
+).split()
+
+@dataclass
+class Fixture:
+    url: str
+    status: int
+    body: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+class FixtureCorpus:
+    """
+    Recorded (or synthetic) responses, one JSON file per URL under
+    directory/<host>/. URLs are normalized the way httpx sends them, so
+    a fixture matches whatever request the scrapers build for it.
+    """
+
+    def __init__(self, directory: str = SCRAPER_FIXTURES_DIR):
+        self.directory = directory
+
+    def _path(self, url: str) -> str:
+        url = httpx.URL(url)
+        name = hashlib.sha256(str(url).encode()).hexdigest()[:32]
+        return os.path.join(self.directory, url.host or "_", f"{name}.json")
+
+    def get(self, url: str) -> Optional[Fixture]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                return Fixture(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def put(self, fixture: Fixture):
+        path = self._path(fixture.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(vars(fixture), f)
+
+    def __contains__(self, url: str) -> bool:
+        return os.path.exists(self._path(url))
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests through to the network and saves every response in the corpus"""
+
+    def __init__(self, corpus: FixtureCorpus, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.corpus = corpus
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        body = await response.aread()
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        text = body.decode(response.encoding or "utf-8", errors="replace")
+        await asyncio.to_thread(self.corpus.put, Fixture(str(request.url), response.status_code, text, headers))
+        return httpx.Response(response.status_code, headers=response.headers, content=body, request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves responses from the corpus without touching the network. Every
+    request waits latency_ms plus up to jitter_ms, and a share of them
+    (error_rate) fail with a 503, to imitate real sites. Unknown URLs get a 404.
+    """
+
+    def __init__(
+        self,
+        corpus: FixtureCorpus,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if self._rng.random() < self.error_rate:
+            return httpx.Response(503, request=request)
+        fixture = await asyncio.to_thread(self.corpus.get, str(request.url))
+        if fixture is None:
+            return httpx.Response(404, request=request)
+        return httpx.Response(fixture.status, headers=fixture.headers, text=fixture.body, request=request)
+
+def synthetic_page(title: str, keywords: List[str], rng: random.Random, paragraphs: int = 30) -> str:
+    """
+    An article page with navigation and footer boilerplate around filler
+    paragraphs; about one sentence in ten mentions one of the keywords
+    """
+    sentences = []
+    for _ in range(paragraphs):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(40, 80))]
+        if keywords and rng.random() < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        sentences.append(" ".join(words).capitalize() + ".")
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(40))
+    body = "".join(f"<p>{sentence}</p>" for sentence in sentences)
+    return (
+        f"<html><head><title>{title}</title></head><body>"
+        f"<nav><ul>{nav}</ul></nav>"
+        f"<article><h1>{title}</h1>{body}</article>"
+        f"<footer><p>Copyright. All rights reserved. Terms of use. Privacy policy.</p></footer>"
+        f"</body></html>"
+    )
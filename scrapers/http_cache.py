@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_CACHE_DIR = os.environ.get(
+    "SCRAPER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "http_cache")
+)
+SCRAPER_CACHE_MAX_BYTES = int(os.environ.get("SCRAPER_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Used for sources that don't set their own cache_ttl
+SCRAPER_CACHE_TTL_SECONDS = float(os.environ.get("SCRAPER_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+# Eviction trims the cache to this fraction of the limit, so it doesn't run on every store
+EVICTION_TARGET = 0.9
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+        return (now or time.time()) - self.fetched_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class HttpCache:
+    """
+    Persistent response cache for scraped pages. Bodies are stored once per
+    distinct content (named by their SHA-256) under bodies/, and a SQLite
+    index maps each URL to its body, validators and fetch time. When the
+    bodies outgrow max_bytes, the least recently used URLs are evicted.
+    """
+
+    def __init__(self, directory: str = SCRAPER_CACHE_DIR, max_bytes: int = SCRAPER_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._index.execute("PRAGMA journal_mode = WAL")
+        self._index.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, "
+            "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._index.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_used ON entries (last_used)")
+        self._index.execute("CREATE INDEX IF NOT EXISTS ix_entries_digest ON entries (digest)")
+        self._index.commit()
+        # Bytes of distinct bodies on disk, kept up to date by put() and eviction
+        self._total = self._index.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)"
+        ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._index.close()
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "bodies", digest[:2], digest)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._index.execute(
+                "SELECT digest, etag, last_modified, fetched_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, etag, last_modified, fetched_at = row
+            try:
+                with open(self._body_path(digest), encoding="utf-8") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self._index.execute("DELETE FROM entries WHERE url = ?", (url,))
+                self._index.commit()
+                return None
+            self._index.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+            self._index.commit()
+        return CacheEntry(url, body, etag, last_modified, fetched_at)
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._body_path(digest)
+        now = time.time()
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(partial, "wb") as f:
+                    f.write(data)
+                os.replace(partial, path)
+                self._total += len(data)
+            previous = self._index.execute("SELECT digest, size FROM entries WHERE url = ?", (url,)).fetchone()
+            self._index.execute(
+                "INSERT OR REPLACE INTO entries (url, digest, size, etag, last_modified, fetched_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, len(data), etag, last_modified, now, now)
+            )
+            if previous and previous[0] != digest:
+                self._remove_orphan(*previous)
+            self._index.commit()
+            self.stats["stored"] += 1
+            self._evict()
+
+    def touch(self, url: str):
+        """Record a successful revalidation: the cached body is fresh again"""
+        now = time.time()
+        with self._lock:
+            self._index.execute("UPDATE entries SET fetched_at = ?, last_used = ? WHERE url = ?", (now, now, url))
+            self._index.commit()
+
+    def size(self) -> int:
+        """Bytes of distinct bodies on disk"""
+        return self._total
+
+    def _remove_orphan(self, digest: str, size: int):
+        """Delete a body file once no URL refers to it"""
+        if self._index.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            try:
+                os.remove(self._body_path(digest))
+                self._total -= size
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICTION_TARGET
+        rows = self._index.execute("SELECT url, digest, size FROM entries ORDER BY last_used").fetchall()
+        for url, digest, size in rows:
+            if self._total <= target:
+                break
+            self._index.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._remove_orphan(digest, size)
+            self.stats["evicted"] += 1
+        self._index.commit()
+        logger.info(f"Evicted scraper cache entries down to {self._total} bytes")
+
+    def record(self, outcome: str):
+        """Count a lookup as a "hit" (fresh), "revalidated" (304) or "miss" (downloaded)"""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        return (self.stats["hits"] + self.stats["revalidated"]) / lookups if lookups else 0.0
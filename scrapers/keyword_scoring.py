@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import re
+
+# From this many keywords on, one pass of the compiled automaton beats a
+# C-level substring search per keyword (see scripts/benchmark_keyword_scoring.py)
+AUTOMATON_MIN_KEYWORDS = 64
+
+@dataclass
+class KeywordMatch:
+    keyword: str
+    weight: float
+    count: int = 0
+    positions: List[int] = field(default_factory=list)
+
+def _trie_pattern(keywords: List[str]) -> str:
+    """Regex for a trie of the keywords, so shared prefixes are only matched once"""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ending here makes the rest of the branch optional
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class KeywordScorer:
+    """
+    A keyword/weight table compiled once and shared by every call. A page
+    scores base plus the weight of each keyword it contains (case-insensitive
+    substring match, counted once however often it occurs), clamped to
+    [low, high]. explain() reports how often and where each keyword matched.
+
+    Large tables are compiled into a single automaton (a trie-shaped regex
+    inside a lookahead, so overlapping matches are all found) and scanned in
+    one pass. Small tables, which is all of them today, are faster as one
+    C-level substring search per keyword.
+    """
+
+    def __init__(self, weights: Dict[str, float], base: float, low: float, high: float):
+        self.weights = {keyword.lower(): weight for keyword, weight in weights.items()}
+        self.base = base
+        self.low = low
+        self.high = high
+        self._automaton: Optional[re.Pattern] = None
+        # Keywords that are a prefix of a longer keyword match wherever the longer one does
+        self._prefixes: Dict[str, List[str]] = {}
+        if len(self.weights) >= AUTOMATON_MIN_KEYWORDS:
+            self._automaton = re.compile(f"(?=({_trie_pattern(list(self.weights))}))")
+            self._prefixes = {
+                keyword: [other for other in self.weights if other != keyword and keyword.startswith(other)]
+                for keyword in self.weights
+            }
+
+    def score(self, text: str) -> float:
+        text = text.lower()
+        if self._automaton is None:
+            present = [keyword for keyword in self.weights if keyword in text]
+        else:
+            found = set()
+            for match in self._automaton.finditer(text):
+                found.add(match.group(1))
+                found.update(self._prefixes[match.group(1)])
+            present = [keyword for keyword in self.weights if keyword in found]
+        return self._clamp(present)
+
+    def explain(self, text: str) -> Tuple[float, Dict[str, KeywordMatch]]:
+        """Score along with the count and start positions of every matched keyword"""
+        text = text.lower()
+        matches: Dict[str, KeywordMatch] = {}
+
+        def record(keyword: str, position: int):
+            match = matches.get(keyword)
+            if match is None:
+                match = matches[keyword] = KeywordMatch(keyword, self.weights[keyword])
+            match.count += 1
+            match.positions.append(position)
+
+        if self._automaton is None:
+            for keyword in self.weights:
+                position = text.find(keyword)
+                while position != -1:
+                    record(keyword, position)
+                    position = text.find(keyword, position + 1)
+        else:
+            for match in self._automaton.finditer(text):
+                for keyword in [match.group(1), *self._prefixes[match.group(1)]]:
+                    record(keyword, match.start())
+            for match in matches.values():
+                match.positions.sort()
+
+        present = [keyword for keyword in self.weights if keyword in matches]
+        return self._clamp(present), matches
+
+    def _clamp(self, present: List[str]) -> float:
+        # Summed in table order, so scores are identical to the per-keyword loops this replaces
+        score = self.base
+        for keyword in present:
+            score += self.weights[keyword]
+        return min(max(score, self.low), self.high)
@@ -1,59 +1,53 @@
 from typing import Dict, Any
 from .base_scraper import BaseScraper
+from .keyword_scoring import KeywordScorer
+
+POLITICAL_SCORER = KeywordScorer(
+    {
+        # Basic scoring based on keywords
+        "campaign contributions": 2.0,
+        "super pac": 3.0,
+        "lobbying": 2.0,
+        "political action committee": 2.0,
+        "federal contribution": 1.0
+    },
+    base=10.0, low=0, high=20
+)
 
 class OpenSecretsScraperError(Exception):
     pass
 
 class OpenSecretsScraper(BaseScraper):
+    error_class = OpenSecretsScraperError
+    source = "OpenSecrets"
+    cache_ttl = 24 * 60 * 60
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.opensecrets.org"
     
-    def get_data(self, identifier: str) -> Dict[str, Any]:
+    def build_urls(self, identifier: str) -> Dict[str, str]:
         """
-        Get political influence data from OpenSecrets
+        Political donation search on OpenSecrets
         identifier: Name or ID of the billionaire
         """
-        try:
-            # Construct search URL (example pattern)
-            search_url = f"{self.base_url}/search?q={identifier}+political+donations"
-            
-            # Extract content
-            content = self.extract_text_content(search_url)
-            cleaned_content = self.clean_data(content)
-            
-            # Process and score the content
-            political_score = self._calculate_political_score(cleaned_content)
-            
-            return {
-                "source": "OpenSecrets",
-                "political_influence_score": political_score,
-                "raw_data": cleaned_content,
-                "timestamp": self.last_updated
-            }
-        except Exception as e:
-            raise OpenSecretsScraperError(f"Failed to scrape OpenSecrets data: {str(e)}")
+        # Search URL (example pattern)
+        return {"search": f"{self.base_url}/search?q={identifier}+political+donations"}
+    
+    def score(self, pages: Dict[str, str]) -> Dict[str, Any]:
+        cleaned_content = self.clean_data(pages["search"])
+    
+        # Process and score the content
+        return {
+            "source": "OpenSecrets",
+            "political_influence_score": self._calculate_political_score(cleaned_content),
+            "raw_data": cleaned_content,
+            "timestamp": self.last_updated
+        }
     
     def _calculate_political_score(self, content: str) -> float:
         """
         Calculate a political influence score based on the scraped content
         Returns a score between 0 and 20
         """
-        score = 10.0  # Default middle score
-        
-        # Basic scoring based on keywords
-        political_keywords = {
-            "campaign contributions": 2.0,
-            "super pac": 3.0,
-            "lobbying": 2.0,
-            "political action committee": 2.0,
-            "federal contribution": 1.0
-        }
-        
-        content_lower = content.lower()
-        for keyword, weight in political_keywords.items():
-            if keyword in content_lower:
-                score += weight
-        
-        # Ensure score stays within bounds
-        return min(max(score, 0), 20)
+        return POLITICAL_SCORER.score(content)
@@ -0,0 +1,152 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Hashable, Iterable, Optional, Tuple, Union
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from .base_scraper import BaseScraper, PageFingerprint
+from .fetcher import AsyncFetcher
+
+logger = logging.getLogger(__name__)
+
+# Extract/score worker processes; parsing is CPU-bound, so one per core
+SCRAPER_PROCESSES = int(os.environ.get("SCRAPER_PROCESSES", str(os.cpu_count() or 1)))
+# Downloaded jobs waiting for a worker; fetching pauses when the queue is full
+SCRAPER_QUEUE_SIZE = int(os.environ.get("SCRAPER_QUEUE_SIZE", str(4 * SCRAPER_PROCESSES)))
+# Concurrent (billionaire, source) downloads; the fetcher's own limits still apply per request
+SCRAPER_FETCH_TASKS = int(os.environ.get("SCRAPER_FETCH_TASKS", "32"))
+
+# A job: (key, scraper, identifier, fingerprint of the last scrape or None).
+# An outcome: the scraper's data, or the exception it raised
+Job = Tuple[Hashable, BaseScraper, str, Optional[PageFingerprint]]
+
+_DONE = object()
+
+class ScrapePipeline:
+    """
+    Two-stage scrape. Fetch tasks download each job's pages on the event
+    loop and hand them over through a bounded queue to the extract/score
+    stage, which runs trafilatura and the keyword scorers in a process
+    pool. Network waits and parsing overlap, parsing uses every core, and
+    the queues bound how many downloaded pages are held in memory. Pages
+    unchanged since the last scrape never reach the pool.
+    """
+
+    def __init__(
+        self,
+        fetcher: AsyncFetcher,
+        processes: int = SCRAPER_PROCESSES,
+        queue_size: int = SCRAPER_QUEUE_SIZE,
+        fetch_tasks: int = SCRAPER_FETCH_TASKS,
+        on_stage: Optional[Callable[[str, float], None]] = None
+    ):
+        self.fetcher = fetcher
+        self.processes = processes
+        self.queue_size = queue_size
+        self.fetch_tasks = fetch_tasks
+        # Called with ("fetch" or "extract", seconds) after each job's stage, e.g. for benchmarks;
+        # ScraperManager adds ("persist", seconds) for each batch it saves
+        self.on_stage = on_stage
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def __aenter__(self) -> "ScrapePipeline":
+        # Spawned rather than forked: the parent runs an event loop and worker threads
+        self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.to_thread(self._pool.shutdown)
+        self._pool = None
+
+    async def run(self, jobs: Union[Iterable[Job], AsyncIterable[Job]]) -> AsyncIterator[Tuple[Hashable, Any]]:
+        """
+        Yield (key, outcome) for every job as its extract/score step finishes.
+        Jobs are pulled lazily, only as fast as the stages drain.
+        """
+        loop = asyncio.get_running_loop()
+        pending: asyncio.Queue = asyncio.Queue(self.fetch_tasks)
+        downloaded: asyncio.Queue = asyncio.Queue(self.queue_size)
+        outcomes: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async def feed():
+            if isinstance(jobs, AsyncIterable):
+                async for job in jobs:
+                    await pending.put(job)
+            else:
+                for job in jobs:
+                    await pending.put(job)
+            for _ in range(self.fetch_tasks):
+                await pending.put(None)
+
+        async def fetch_stage():
+            while True:
+                job = await pending.get()
+                if job is None:
+                    return
+                key, scraper, identifier, previous = job
+                started = time.perf_counter()
+                try:
+                    downloads = await scraper.fetch_pages(identifier, self.fetcher)
+                    reused = scraper.reuse_unchanged(downloads, previous)
+                except Exception as e:
+                    await outcomes.put((key, e))
+                    continue
+                if self.on_stage:
+                    self.on_stage("fetch", time.perf_counter() - started)
+                if reused is not None:
+                    await outcomes.put((key, reused))
+                else:
+                    await downloaded.put((key, scraper, downloads, previous))
+
+        async def extract_stage():
+            while True:
+                item = await downloaded.get()
+                if item is None:
+                    return
+                key, scraper, downloads, previous = item
+                started = time.perf_counter()
+                try:
+                    outcome = await loop.run_in_executor(self._pool, scraper.score_downloads, downloads, previous)
+                except Exception as e:
+                    outcome = e
+                if self.on_stage:
+                    self.on_stage("extract", time.perf_counter() - started)
+                await outcomes.put((key, outcome))
+
+        async def stages():
+            feeder = asyncio.create_task(feed())
+            fetchers = [asyncio.create_task(fetch_stage()) for _ in range(self.fetch_tasks)]
+            # Two consumers per process keep the next job queued while one is returning
+            extractors = [asyncio.create_task(extract_stage()) for _ in range(2 * self.processes)]
+            tasks = [feeder, *fetchers, *extractors]
+            cancelled = False
+            try:
+                await asyncio.gather(feeder, *fetchers)
+                for _ in extractors:
+                    await downloaded.put(None)
+                await asyncio.gather(*extractors)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # After an error or cancellation, stop every stage still blocked on a queue
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                # Once the consumer has stopped, nobody would read the end marker
+                if not cancelled:
+                    await outcomes.put(_DONE)
+
+        runner = asyncio.create_task(stages())
+        try:
+            while True:
+                item = await outcomes.get()
+                if item is _DONE:
+                    break
+                yield item
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import asyncio
+import os
+import random
+import time
+
+# Concurrency is cut back when a host answers slower than this
+SCRAPER_LATENCY_TARGET_SECONDS = float(os.environ.get("SCRAPER_LATENCY_TARGET_SECONDS", "5"))
+# Retries of a request that hit 429/5xx or a network error, with jittered exponential backoff
+SCRAPER_MAX_RETRIES = int(os.environ.get("SCRAPER_MAX_RETRIES", "3"))
+SCRAPER_BACKOFF_BASE_SECONDS = float(os.environ.get("SCRAPER_BACKOFF_BASE_SECONDS", "1"))
+SCRAPER_BACKOFF_MAX_SECONDS = float(os.environ.get("SCRAPER_BACKOFF_MAX_SECONDS", "60"))
+
+# Multiplicative decrease on an overload response, gentler on a slow one
+OVERLOAD_DECREASE = 0.5
+SLOW_DECREASE = 0.9
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff for the given retry (0-based), never shorter than Retry-After"""
+    delay = random.uniform(0, min(SCRAPER_BACKOFF_MAX_SECONDS, SCRAPER_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class HostThrottle:
+    """
+    Politeness for one host: a token bucket caps the request rate, and an
+    AIMD limit caps concurrent requests. The limit grows by one per limit's
+    worth of fast successes and shrinks multiplicatively on 429/503 answers
+    or slow ones. Retry-After pauses the whole host. Use as an async
+    context manager around each request and report how it went.
+    """
+
+    def __init__(self, rate: float, max_concurrency: int, latency_target: float = SCRAPER_LATENCY_TARGET_SECONDS):
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.latency_target = latency_target
+        self.in_flight = 0
+        # Burst of one second's worth, and at least one request
+        self._burst = max(1.0, rate)
+        self._tokens = self._burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._bucket_lock = asyncio.Lock()
+        self._slot_freed = asyncio.Condition()
+
+    async def __aenter__(self) -> "HostThrottle":
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            await self._take_token()
+        except BaseException:
+            await self._release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._release()
+
+    async def _release(self):
+        async with self._slot_freed:
+            self.in_flight -= 1
+            self._slot_freed.notify_all()
+
+    async def _take_token(self):
+        # One waiter at a time, so requests leave in arrival order
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            self.limit = max(1.0, self.limit * SLOW_DECREASE)
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+    def on_overload(self, retry_after: Optional[float] = None):
+        """The host answered 429/503: back off, and pause it for Retry-After if given"""
+        self.limit = max(1.0, self.limit * OVERLOAD_DECREASE)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
@@ -1,19 +1,52 @@
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+from collections import Counter, defaultdict
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime
+import asyncio
 import logging
+import os
+import time
 from .opensecrets_scraper import OpenSecretsScraperError, OpenSecretsScraper
 from .propublica_scraper import ProPublicaScraperError, ProPublicaScraper
 from .cdp_scraper import CDPScraperError, CDPScraper
 from .sec_scraper import SECScraperError, SECScraper
 from .glassdoor_scraper import GlassdoorScraperError, GlassdoorScraper
-from database import Database
+from .base_scraper import PageFingerprint
+from .fetcher import AsyncFetcher
+from .pipeline import ScrapePipeline
+from database import Database, ScrapeResult
+from models import Billionaire
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Billionaires whose results are written per transaction during a full refresh
+SCRAPE_RESULT_BATCH_SIZE = int(os.environ.get("SCRAPE_RESULT_BATCH_SIZE", "200"))
+# Billionaires read from the database at a time during a full refresh
+SCRAPER_ID_CHUNK_SIZE = int(os.environ.get("SCRAPER_ID_CHUNK_SIZE", "500"))
+
+# What a scrape is about: company-scoped sources are scraped per company, the rest per billionaire
+BILLIONAIRE = "billionaire"
+COMPANY = "company"
+
+# (BILLIONAIRE or COMPANY, billionaire or company ID, source)
+ScrapeKey = Tuple[str, str, str]
+# (company_id, company name)
+Company = Tuple[str, str]
+
 class ScraperManager:
-    def __init__(self):
+    def __init__(
+        self,
+        fetcher_factory: Callable[[], AsyncFetcher] = AsyncFetcher,
+        pipeline_factory: Callable[[AsyncFetcher], ScrapePipeline] = ScrapePipeline
+    ):
+        """
+        The factories build the fetcher and pipeline each refresh runs on;
+        benchmarks pass ones that replay fixtures or time the stages.
+        """
         self.db = Database()
+        self.fetcher_factory = fetcher_factory
+        self.pipeline_factory = pipeline_factory
         self.scrapers = {
             'opensecrets': OpenSecretsScraper(),
             'propublica': ProPublicaScraper(),
@@ -21,6 +54,46 @@ class ScraperManager:
             'sec': SECScraper(),
             'glassdoor': GlassdoorScraper(),
         }
+        # Scrapes whose pages were unchanged since the last refresh, by the step they skipped;
+        # "shared" counts company scrapes reused from another billionaire in the same refresh
+        self.skipped: Counter = Counter()
+        # Open while the manager is used as an async context manager
+        self._pipeline: Optional[ScrapePipeline] = None
+        self._stack: Optional[AsyncExitStack] = None
+
+    async def __aenter__(self) -> "ScraperManager":
+        """
+        Keep one fetcher and pipeline open until exit. Host throttles (with
+        their Retry-After pauses and AIMD limits), kept-alive connections and
+        the worker processes then carry over from one refresh to the next.
+        """
+        self._stack = AsyncExitStack()
+        fetcher = await self._stack.enter_async_context(self.fetcher_factory())
+        self._pipeline = await self._stack.enter_async_context(self.pipeline_factory(fetcher))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._pipeline = None
+        await self._stack.aclose()
+        self._stack = None
+
+    @asynccontextmanager
+    async def _open_fetcher(self) -> AsyncIterator[AsyncFetcher]:
+        """The manager's fetcher while it is open, else one for this call"""
+        if self._pipeline is not None:
+            yield self._pipeline.fetcher
+            return
+        async with self.fetcher_factory() as fetcher:
+            yield fetcher
+
+    @asynccontextmanager
+    async def _open_pipeline(self) -> AsyncIterator[ScrapePipeline]:
+        """The manager's pipeline while it is open, else one for this call"""
+        if self._pipeline is not None:
+            yield self._pipeline
+            return
+        async with self.fetcher_factory() as fetcher, self.pipeline_factory(fetcher) as pipeline:
+            yield pipeline
 
     async def update_billionaire_data(self, billionaire_id: str) -> Dict[str, Any]:
         """Update billionaire data from all sources"""
@@ -30,57 +103,380 @@ class ScraperManager:
                 logger.error(f"Billionaire with ID {billionaire_id} not found")
                 return {"error": "Billionaire not found"}
 
-            # Collect data from each source
-            try:
-                political_data = self.scrapers['opensecrets'].get_data(billionaire.name)
-                philanthropy_data = self.scrapers['propublica'].get_data(billionaire.name)
-                environmental_data = self.scrapers['cdp'].get_data(billionaire.name)
-                governance_data = self.scrapers['sec'].get_data(billionaire.name)
-                worker_data = self.scrapers['glassdoor'].get_data(billionaire.name)
-
-                # Update scores
-                new_scores = {
-                    'political_score': political_data['political_influence_score'],
-                    'philanthropy_score': philanthropy_data['philanthropy_score'],
-                    'environmental_score': environmental_data['environmental_score'],
-                    'social_score': (
-                        philanthropy_data['tax_practice_impact'] * 0.4 +
-                        governance_data['governance_score'] * 0.3 +
-                        worker_data['worker_treatment_score'] * 0.3
-                    )
-                }
-
-                # Log the update
-                logger.info(f"Updated scores for {billionaire.name}: {new_scores}")
-
-                return new_scores
-
-            except (OpenSecretsScraperError, ProPublicaScraperError, CDPScraperError, 
-                    SECScraperError, GlassdoorScraperError) as e:
-                logger.error(f"Error updating billionaire data: {str(e)}")
-                return {"error": str(e)}
+            linked = await asyncio.to_thread(self.db.get_billionaire_companies, [billionaire.id])
+            companies = linked.get(billionaire.id, [])
+            fingerprints = await asyncio.to_thread(
+                self._load_fingerprints, [billionaire.id], [key for key, _ in companies]
+            )
+            async with self._open_fetcher() as fetcher:
+                scraped = await self._collect_outcomes(billionaire, companies, fetcher, fingerprints)
+            self.skipped = self._count_skipped(scraped.values())
+            outcomes = self._shared_outcomes(
+                {source: data for (kind, _, source), data in scraped.items() if kind == BILLIONAIRE},
+                companies,
+                {(key, source): data for (kind, key, source), data in scraped.items() if kind == COMPANY}
+            )
+            new_scores = self._combine_scores(billionaire, outcomes)
+            await asyncio.to_thread(
+                self._persist,
+                self._scrape_rows(billionaire.id, outcomes),
+                {} if "error" in new_scores else {billionaire.id: new_scores},
+                [
+                    row
+                    for (kind, key, source), data in scraped.items() if kind == COMPANY
+                    for row in self._scrape_rows(key, {source: data})
+                ]
+            )
+            return new_scores
 
         except Exception as e:
             logger.error(f"Unexpected error in update_billionaire_data: {str(e)}")
             return {"error": "Internal server error"}
 
-    async def update_all_billionaires(self):
-        """Update data for all billionaires in the database"""
-        billionaires = self.db.get_billionaires()
-        results = []
-        for billionaire in billionaires:
-            try:
-                result = await self.update_billionaire_data(billionaire.id)
-                results.append({
-                    "billionaire_id": billionaire.id,
-                    "name": billionaire.name,
-                    "result": result
-                })
-            except Exception as e:
-                logger.error(f"Failed to update data for {billionaire.name}: {str(e)}")
-                results.append({
-                    "billionaire_id": billionaire.id,
-                    "name": billionaire.name,
-                    "error": str(e)
-                })
-        return results
\ No newline at end of file
+    async def _collect_outcomes(
+        self,
+        billionaire: Billionaire,
+        companies: List[Company],
+        fetcher: AsyncFetcher,
+        fingerprints: Dict[ScrapeKey, PageFingerprint]
+    ) -> Dict[ScrapeKey, Any]:
+        """Run every scrape one billionaire needs concurrently; each outcome is the data or the exception raised"""
+        scrapes = list(self._scrapes(billionaire, companies))
+        outcomes = await asyncio.gather(
+            *(
+                scraper.get_data_async(identifier, fetcher, fingerprints.get(key))
+                for key, scraper, identifier in scrapes
+            ),
+            return_exceptions=True
+        )
+        return dict(zip((key for key, _, _ in scrapes), outcomes))
+
+    def _scrapes(self, billionaire: Billionaire, companies: List[Company]) -> Iterator[Tuple[ScrapeKey, Any, str]]:
+        """
+        (key, scraper, identifier) of every scrape a billionaire's refresh needs.
+        Company-scoped sources scrape each of the billionaire's companies, or
+        the billionaire's own name when no company is linked.
+        """
+        for source, scraper in self.scrapers.items():
+            if scraper.company_scoped and companies:
+                for key, name in companies:
+                    yield (COMPANY, key, source), scraper, name
+            else:
+                yield (BILLIONAIRE, billionaire.id, source), scraper, billionaire.name
+
+    def _shared_outcomes(
+        self,
+        outcomes: Dict[str, Any],
+        companies: List[Company],
+        company_outcomes: Dict[Tuple[str, str], Any]
+    ) -> Dict[str, Any]:
+        """
+        A billionaire's outcome per source: its own scrapes, plus each company-scoped
+        source averaged over the billionaire's companies. A source fails if any
+        company's scrape failed. The combined outcome carries no page text;
+        that stays with the companies.
+        """
+        outcomes = dict(outcomes)
+        if not companies:
+            return outcomes
+        for source, scraper in self.scrapers.items():
+            if not scraper.company_scoped:
+                continue
+            parts = [company_outcomes[key, source] for key, _ in companies]
+            failed = next((part for part in parts if isinstance(part, BaseException)), None)
+            if failed is not None:
+                outcomes[source] = failed
+                continue
+            outcomes[source] = {
+                name: sum(part[name] for part in parts) / len(parts)
+                for name, value in parts[0].items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+        return outcomes
+
+    def _combine_scores(self, billionaire: Billionaire, outcomes: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine each source's data (or the exception it raised) into the billionaire's new scores"""
+        try:
+            for outcome in outcomes.values():
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            political_data = outcomes['opensecrets']
+            philanthropy_data = outcomes['propublica']
+            environmental_data = outcomes['cdp']
+            governance_data = outcomes['sec']
+            worker_data = outcomes['glassdoor']
+
+            # Update scores
+            new_scores = {
+                'political_score': political_data['political_influence_score'],
+                'philanthropy_score': philanthropy_data['philanthropy_score'],
+                'environmental_score': environmental_data['environmental_score'],
+                'social_score': (
+                    philanthropy_data['tax_practice_impact'] * 0.4 +
+                    governance_data['governance_score'] * 0.3 +
+                    worker_data['worker_treatment_score'] * 0.3
+                )
+            }
+
+            # Log the update
+            logger.info(f"Updated scores for {billionaire.name}: {new_scores}")
+
+            return new_scores
+
+        except (OpenSecretsScraperError, ProPublicaScraperError, CDPScraperError,
+                SECScraperError, GlassdoorScraperError) as e:
+            logger.error(f"Error updating billionaire data: {str(e)}")
+            return {"error": str(e)}
+
+    def _result(self, billionaire: Billionaire, outcomes: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            new_scores = self._combine_scores(billionaire, outcomes)
+            result = {
+                "billionaire_id": billionaire.id,
+                "name": billionaire.name,
+                "result": new_scores
+            }
+            if "error" not in new_scores:
+                # How far this refresh moved the scores; the scheduler revisits volatile billionaires sooner
+                result["score_change"] = sum(
+                    abs(score - getattr(billionaire, column)) for column, score in new_scores.items()
+                )
+            return result
+        except Exception as e:
+            logger.error(f"Failed to update data for {billionaire.name}: {str(e)}")
+            return {
+                "billionaire_id": billionaire.id,
+                "name": billionaire.name,
+                "error": str(e)
+            }
+
+    async def update_all_billionaires(self) -> Dict[str, int]:
+        """
+        Update data for all billionaires in the database. Billionaires are
+        streamed from the database in chunks and results are saved and
+        dropped batch by batch, so memory stays flat however many there are.
+        Returns how many were updated and how many failed.
+        """
+        summary = Counter(updated=0, failed=0)
+        async for result in self.stream_updates(self._billionaire_chunks()):
+            failed = "error" in result or "error" in result["result"]
+            summary["failed" if failed else "updated"] += 1
+        return dict(summary)
+
+    async def update_billionaires(self, billionaires: List[Billionaire]) -> List[Dict[str, Any]]:
+        """Update data for a batch of billionaires, returning each one's result"""
+        async def chunks():
+            yield billionaires
+
+        return [result async for result in self.stream_updates(chunks())]
+
+    async def _billionaire_chunks(self) -> AsyncIterator[List[Billionaire]]:
+        """Every billionaire, SCRAPER_ID_CHUNK_SIZE at a time in ID order"""
+        after = None
+        while True:
+            chunk = await asyncio.to_thread(self.db.get_billionaires_after, after, SCRAPER_ID_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+            after = chunk[-1].id
+
+    async def stream_updates(self, chunks: AsyncIterator[List[Billionaire]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Update data for every billionaire of the chunks, yielding each result
+        once its batch is saved. Downloads run on the event loop while text
+        extraction and scoring run in a process pool; bounded queues between
+        the stages keep only a few chunks' worth of work in memory.
+
+        Company-scoped sources are scraped once per company and refresh: a
+        billionaire whose company was already scraped (or is being scraped)
+        for someone else waits for and shares that outcome. Shared outcomes
+        stay in memory only while a billionaire in flight links to the company;
+        after their batch is saved, later billionaires read them back from
+        company_scrape_results, so memory stays bounded by the chunk size too.
+        """
+        # Billionaires with scrapes in flight, their companies, own outcomes so far and scrapes still awaited
+        in_flight: Dict[str, Billionaire] = {}
+        linked: Dict[str, List[Company]] = {}
+        partial: Dict[str, Dict[str, Any]] = {}
+        awaited: Dict[str, int] = {}
+        # This refresh's company scrapes by (company_id, source), without page text, and who waits for them
+        company_outcomes: Dict[Tuple[str, str], Any] = {}
+        waiting: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        # Billionaires in flight per company; a company's outcomes are dropped once saved and unreferenced
+        company_refs: Counter = Counter()
+        started = datetime.utcnow()
+        # Feeding and saving overlap, but share the manager's session on the primary
+        primary = asyncio.Lock()
+
+        async def jobs():
+            async for chunk in chunks:
+                ids = [billionaire.id for billionaire in chunk]
+                async with primary:
+                    companies = await asyncio.to_thread(self.db.get_billionaire_companies, ids)
+                    company_ids = list({key for links in companies.values() for key, _ in links})
+                    fingerprints = await asyncio.to_thread(self._load_fingerprints, ids, company_ids)
+                    # Companies scraped earlier in this refresh whose outcomes were already dropped
+                    saved = await asyncio.to_thread(self.db.get_company_scores_since, company_ids, started)
+                for key, source, company_scores in saved:
+                    if (key, source) not in waiting:
+                        company_outcomes.setdefault((key, source), company_scores)
+                # Billionaire-major order, so each billionaire's sources finish close together
+                for billionaire in chunk:
+                    in_flight[billionaire.id] = billionaire
+                    linked[billionaire.id] = companies.get(billionaire.id, [])
+                    company_refs.update(key for key, _ in linked[billionaire.id])
+                    partial[billionaire.id] = {}
+                    awaited[billionaire.id] = 0
+                    scrapes = []
+                    for key, scraper, identifier in self._scrapes(billionaire, linked[billionaire.id]):
+                        kind, entity_id, source = key
+                        if kind == COMPANY and (entity_id, source) in company_outcomes:
+                            self.skipped["shared"] += 1
+                            continue
+                        awaited[billionaire.id] += 1
+                        if kind == COMPANY:
+                            waiting[entity_id, source].append(billionaire.id)
+                            if len(waiting[entity_id, source]) > 1:
+                                # Already being scraped for another billionaire
+                                self.skipped["shared"] += 1
+                                continue
+                        scrapes.append((key, scraper, identifier, fingerprints.get(key)))
+                    # All waits are registered before the first job goes out; every billionaire
+                    # has scrapes of its own, so each one awaits at least one outcome
+                    for job in scrapes:
+                        yield job
+
+        self.skipped = Counter()
+        refreshed = 0
+        # The current batch: scrape rows for the bulk upserts, scores for the set-based update
+        rows: List[ScrapeResult] = []
+        company_rows: List[ScrapeResult] = []
+        scores: Dict[str, Dict[str, float]] = {}
+        batch: List[Dict[str, Any]] = []
+
+        async def persist(pipeline: ScrapePipeline):
+            async with primary:
+                started = time.perf_counter()
+                await self._persist_batch(batch, rows, scores, company_rows)
+            # Reported alongside the pipeline's own fetch and extract stages
+            if pipeline.on_stage:
+                pipeline.on_stage("persist", time.perf_counter() - started)
+
+        async with self._open_pipeline() as pipeline:
+            async for (kind, entity_id, source), outcome in pipeline.run(jobs()):
+                self.skipped.update(self._count_skipped([outcome]))
+                if kind == COMPANY:
+                    company_rows.extend(self._scrape_rows(entity_id, {source: outcome}))
+                    if not isinstance(outcome, BaseException):
+                        outcome = {name: value for name, value in outcome.items() if name != "raw_data"}
+                    company_outcomes[entity_id, source] = outcome
+                    ready = waiting.pop((entity_id, source))
+                else:
+                    partial[entity_id][source] = outcome
+                    ready = [entity_id]
+
+                for billionaire_id in ready:
+                    awaited[billionaire_id] -= 1
+                    if awaited[billionaire_id]:
+                        continue
+                    del awaited[billionaire_id]
+                    billionaire = in_flight.pop(billionaire_id)
+                    companies = linked.pop(billionaire_id)
+                    company_refs.subtract(key for key, _ in companies)
+                    outcomes = self._shared_outcomes(partial.pop(billionaire_id), companies, company_outcomes)
+                    result = self._result(billionaire, outcomes)
+                    batch.append(result)
+                    rows.extend(self._scrape_rows(billionaire_id, outcomes))
+                    if "error" not in result and "error" not in result["result"]:
+                        scores[billionaire_id] = result["result"]
+
+                if len(batch) >= SCRAPE_RESULT_BATCH_SIZE:
+                    await persist(pipeline)
+                    # Saved now, so billionaires of later chunks can read them back
+                    for key in [key for key in company_outcomes if company_refs[key[0]] <= 0]:
+                        del company_outcomes[key]
+                        company_refs.pop(key[0], None)
+                    refreshed += len(batch)
+                    for saved in batch:
+                        yield saved
+                    rows, company_rows, scores, batch = [], [], {}, []
+
+            await persist(pipeline)
+        refreshed += len(batch)
+        for saved in batch:
+            yield saved
+        logger.info(
+            f"Refreshed {refreshed} billionaires; of {self.skipped['scraped']} source scrapes "
+            f"{self.skipped['extraction']} had unchanged pages and {self.skipped['scoring']} unchanged text; "
+            f"{self.skipped['shared']} company scrapes were shared with another billionaire"
+        )
+
+    async def _persist_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        rows: List[ScrapeResult],
+        scores: Dict[str, Dict[str, float]],
+        company_rows: List[ScrapeResult]
+    ):
+        if not await asyncio.to_thread(self._persist, rows, scores, company_rows):
+            for result in batch:
+                result["error"] = "Failed to save results"
+
+    def _load_fingerprints(self, billionaire_ids: List[str], company_ids: List[str]) -> Dict[ScrapeKey, PageFingerprint]:
+        fingerprints = {
+            (BILLIONAIRE, billionaire_id, source): PageFingerprint(body_hash, text_hash, scores)
+            for billionaire_id, source, body_hash, text_hash, scores in self.db.get_scrape_fingerprints(billionaire_ids)
+        }
+        fingerprints.update(
+            ((COMPANY, key, source), PageFingerprint(body_hash, text_hash, scores))
+            for key, source, body_hash, text_hash, scores in self.db.get_company_scrape_fingerprints(company_ids)
+        )
+        return fingerprints
+
+    @staticmethod
+    def _count_skipped(outcomes) -> Counter:
+        """How many scrapes succeeded, and how many of them skipped extraction or scoring"""
+        counts = Counter()
+        for data in outcomes:
+            if not isinstance(data, BaseException):
+                counts["scraped"] += 1
+                if data.get("skipped"):
+                    counts[data["skipped"]] += 1
+        return counts
+
+    @staticmethod
+    def _scrape_rows(entity_id: str, outcomes: Dict[str, Any]) -> List[ScrapeResult]:
+        """Rows for scrape_results (or company_scrape_results) from every source that succeeded"""
+        fetched_at = datetime.utcnow()
+        return [
+            (
+                entity_id,
+                source,
+                fetched_at,
+                {key: value for key, value in data.items() if isinstance(value, (int, float))},
+                data.get("raw_data"),
+                data.get("body_hash"),
+                data.get("text_hash")
+            )
+            for source, data in outcomes.items()
+            if not isinstance(data, BaseException)
+        ]
+
+    def _persist(
+        self,
+        rows: List[ScrapeResult],
+        scores: Dict[str, Dict[str, float]],
+        company_rows: List[ScrapeResult] = ()
+    ) -> bool:
+        """Write one batch: bulk upserts of the scrapes, then one set-based update of the scores"""
+        try:
+            self.db.save_company_scrape_results(list(company_rows))
+            self.db.save_scrape_results(rows)
+            if scores:
+                version = self.db.apply_scraped_scores(scores)
+                logger.info(f"Saved scores for {len(scores)} billionaires, ranking version {version}")
+            return True
+        except Exception as e:
+            self.db.db.rollback()
+            logger.error(f"Failed to save a batch of {len(rows)} scrape results: {str(e)}")
+            return False
@@ -1,62 +1,59 @@
 from typing import Dict, Any
 from .base_scraper import BaseScraper
+from .keyword_scoring import KeywordScorer
 from datetime import datetime
 
+GOVERNANCE_SCORER = KeywordScorer(
+    {
+        "board independence": 2.0,
+        "executive compensation": 1.5,
+        "shareholder rights": 2.0,
+        "corporate governance": 1.5,
+        "audit committee": 1.0,
+        "compliance": 1.0,
+        "risk management": 1.0,
+        "internal controls": 1.0,
+        "disclosure": 1.0
+    },
+    base=15.0, low=0, high=30
+)
+
 class SECScraperError(Exception):
     pass
 
 class SECScraper(BaseScraper):
+    error_class = SECScraperError
+    source = "SEC"
+    cache_ttl = 24 * 60 * 60
+    # SEC EDGAR fair access policy: at most 10 requests per second
+    requests_per_second = 10
+    company_scoped = True
+
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.sec.gov"
     
-    def get_data(self, identifier: str) -> Dict[str, Any]:
+    def build_urls(self, identifier: str) -> Dict[str, str]:
         """
-        Get corporate filing data from SEC EDGAR
-        identifier: Name or ID of the billionaire
+        Corporate filing search on SEC EDGAR
+        identifier: Company name (the billionaire's name when no company is known)
         """
-        try:
-            # Construct EDGAR search URL
-            search_url = f"{self.base_url}/edgar/searchedgar/companysearch.html?query={identifier}"
-            
-            # Extract content
-            content = self.extract_text_content(search_url)
-            cleaned_content = self.clean_data(content)
-            
-            # Calculate transparency and governance scores
-            governance_impact = self._assess_corporate_governance(cleaned_content)
-            
-            return {
-                "source": "SEC",
-                "governance_score": governance_impact,
-                "raw_data": cleaned_content,
-                "timestamp": self.last_updated
-            }
-        except Exception as e:
-            raise SECScraperError(f"Failed to scrape SEC data: {str(e)}")
+        return {"search": f"{self.base_url}/edgar/searchedgar/companysearch.html?query={identifier}"}
+    
+    def score(self, pages: Dict[str, str]) -> Dict[str, Any]:
+        cleaned_content = self.clean_data(pages["search"])
+    
+        # Calculate transparency and governance scores
+        return {
+            "source": "SEC",
+            "governance_score": self._assess_corporate_governance(cleaned_content),
+            "raw_data": cleaned_content,
+            "timestamp": self.last_updated
+        }
     
     def _assess_corporate_governance(self, content: str) -> float:
         """
         Calculate corporate governance score based on SEC filings
         Returns a score between 0 and 30 (contributes to social score)
         """
-        score = 15.0  # Default middle score
-        
-        governance_keywords = {
-            "board independence": 2.0,
-            "executive compensation": 1.5,
-            "shareholder rights": 2.0,
-            "corporate governance": 1.5,
-            "audit committee": 1.0,
-            "compliance": 1.0,
-            "risk management": 1.0,
-            "internal controls": 1.0,
-            "disclosure": 1.0
-        }
-        
-        content_lower = content.lower()
-        for keyword, impact in governance_keywords.items():
-            if keyword in content_lower:
-                score += impact
-        
-        return min(max(score, 0), 30)
+        return GOVERNANCE_SCORER.score(content)
@@ -0,0 +1,121 @@
+import argparse
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from scrapers.keyword_scoring import AUTOMATON_MIN_KEYWORDS, KeywordScorer
+from scrapers.cdp_scraper import ENVIRONMENTAL_SCORER
+from scrapers.glassdoor_scraper import WORKER_TREATMENT_SCORER
+from scrapers.opensecrets_scraper import POLITICAL_SCORER
+from scrapers.propublica_scraper import PHILANTHROPY_SCORER, TAX_PRACTICE_SCORER
+from scrapers.sec_scraper import GOVERNANCE_SCORER
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORERS = {
+    'environmental': ENVIRONMENTAL_SCORER,
+    'political': POLITICAL_SCORER,
+    'governance': GOVERNANCE_SCORER,
+    'worker treatment': WORKER_TREATMENT_SCORER,
+    'philanthropy': PHILANTHROPY_SCORER,
+    'tax practice': TAX_PRACTICE_SCORER,
+}
+
+FILLER = (
+    "the company reported annual results and the board discussed its strategy with "
+    "investors while analysts reviewed filings statements and public records"
+).split()
+
+def synthetic_page(size: int, keywords, rng: random.Random) -> str:
+    """
+    Filler prose of about size characters with a few of the keywords sprinkled
+    in; like real pages, most of a table's keywords never occur
+    """
+    keywords = rng.sample(keywords, min(3, len(keywords)))
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < 0.01 else rng.choice(FILLER)
+        words.append(word.upper() if rng.random() < 0.05 else word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def per_keyword_loop(scorer: KeywordScorer, content: str) -> float:
+    """The scrapers' previous scoring: rebuild the table, lowercase, one substring scan per keyword"""
+    score = scorer.base
+    keywords = dict(scorer.weights)
+    content_lower = content.lower()
+    for keyword, weight in keywords.items():
+        if keyword in content_lower:
+            score += weight
+    return min(max(score, scorer.low), scorer.high)
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def large_table(n: int, rng: random.Random) -> KeywordScorer:
+    vocabulary = "tax fund grant carbon board labor union wage safety lawsuit fraud audit donor charity climate coal oil gas solar wind policy lobby senate court fine penalty".split()
+    keywords = set()
+    while len(keywords) < n:
+        keywords.add(" ".join(rng.sample(vocabulary, 2)))
+    # Lead with keywords that are prefixes of others, which the automaton has to report too
+    keywords = ["tax", "tax fund", "coal"] + sorted(keywords)
+    return KeywordScorer({keyword: rng.uniform(-3, 3) for keyword in keywords}, base=10.0, low=0, high=20)
+
+def run(sizes, repeat: int, large_keywords: int):
+    rng = random.Random(0)
+    ok = True
+    tables = dict(SCORERS)
+    tables[f'{large_keywords}-keyword table'] = large_table(large_keywords, rng)
+
+    for size in sizes:
+        for name, scorer in tables.items():
+            page = synthetic_page(size, list(scorer.weights), rng)
+            legacy = per_keyword_loop(scorer, page)
+            score, matches = scorer.explain(page)
+            if scorer.score(page) != legacy or score != legacy:
+                ok = False
+                logger.error(f"{name}: KeywordScorer disagrees with the per-keyword loop ({score} vs {legacy})")
+
+            baseline = best_of(lambda: per_keyword_loop(scorer, page), repeat)
+            scored = best_of(lambda: scorer.score(page), repeat)
+            explained = best_of(lambda: scorer.explain(page), repeat)
+            mode = "automaton" if len(scorer.weights) >= AUTOMATON_MIN_KEYWORDS else "substring"
+            logger.info(
+                f"{size // 1000:>6} KB {name:>20} ({len(scorer.weights):>3} keywords, {mode}): "
+                f"per-keyword {baseline * 1000:7.2f} ms, score {scored * 1000:7.2f} ms "
+                f"({baseline / scored:4.1f}x), explain {explained * 1000:7.2f} ms, "
+                f"{sum(match.count for match in matches.values())} matches"
+            )
+
+    # Both strategies must report the same matches for the same table
+    scorer = tables[f'{large_keywords}-keyword table']
+    substring = KeywordScorer(dict(list(scorer.weights.items())[:AUTOMATON_MIN_KEYWORDS - 1]), 10.0, 0, 20)
+    automaton = KeywordScorer(
+        {**substring.weights, **{f"filler keyword {i}": 0.0 for i in range(AUTOMATON_MIN_KEYWORDS)}}, 10.0, 0, 20
+    )
+    page = " ".join(synthetic_page(sizes[0], list(substring.weights), rng) for _ in range(10))
+    expected = {keyword: match.positions for keyword, match in substring.explain(page)[1].items()}
+    actual = {keyword: match.positions for keyword, match in automaton.explain(page)[1].items()}
+    if expected != actual:
+        ok = False
+        logger.error("Automaton and substring matching report different matches")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-keyword scoring loops with the shared KeywordScorer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 1000000], help="Page sizes in characters")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--large-keywords", type=int, default=200, help="Size of the synthetic large table")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.sizes, args.repeat, args.large_keywords) else 1)
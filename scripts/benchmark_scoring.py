@@ -0,0 +1,99 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from database import Database
+from database_models import Base, BillionaireModel
+from scoring import DEFAULT_WEIGHTS
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORE_LIMITS = {'social': 30, 'environmental': 20, 'political': 20, 'philanthropy': 20, 'cultural': 10}
+
+def seed(session, n: int, seed: int = 0):
+    """n billionaires with random in-range category scores"""
+    rng = random.Random(seed)
+    session.bulk_insert_mappings(BillionaireModel, [
+        {
+            'id': str(i),
+            'name': f"Billionaire {i}",
+            'net_worth': rng.uniform(1, 300),
+            **{f"{category}_score": rng.uniform(0, limit) for category, limit in SCORE_LIMITS.items()},
+            'overall_score': 0.0
+        } for i in range(n)
+    ])
+    session.commit()
+
+def row_by_row(db: Database, weights, k):
+    """The old path: score every ORM row in Python, commit, then sort all billionaires for the top k"""
+    for b in db.db.query(BillionaireModel).all():
+        b.overall_score = (
+            b.social_score * weights['social'] +
+            b.environmental_score * weights['environmental'] +
+            b.political_score * weights['political'] +
+            b.philanthropy_score * weights['philanthropy'] +
+            b.cultural_score * weights['cultural']
+        )
+    db.db.commit()
+    return sorted(db.get_billionaires(), key=lambda x: (-x.overall_score, x.id))[:k]
+
+def set_based(db: Database, weights, k):
+    """The current path: one UPDATE plus the materialized rankings, then the top k from those"""
+    db.update_billionaire_scores(weights)
+    return db.get_ranked_billionaires(k)
+
+def reset(db: Database):
+    """Zero the overall scores, so every timed run really has to write them all"""
+    db.db.execute(update(BillionaireModel).values(overall_score=0.0))
+    db.db.commit()
+
+def best_of(fn, setup, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run(sizes, k: int, repeat: int):
+    weights = DEFAULT_WEIGHTS
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+            Base.metadata.create_all(engine)
+            db = Database(sessionmaker(bind=engine)())
+            seed(db.db, n)
+
+            # Both sides start from the same rows and return the same top k as Billionaire models
+            baseline = best_of(lambda: row_by_row(db, weights, k), lambda: reset(db), repeat)
+            current = best_of(lambda: set_based(db, weights, k), lambda: reset(db), repeat)
+
+            expected = [b.id for b in row_by_row(db, weights, k)]
+            actual = [b.id for b in set_based(db, weights, k)]
+            if expected != actual:
+                logger.warning(f"n={n}: set-based top-{k} differs from the row-by-row ranking")
+
+            logger.info(
+                f"n={n:>7} top-{k}: row-by-row {baseline * 1000:9.2f} ms, "
+                f"set-based {current * 1000:9.2f} ms ({baseline / current:,.1f}x)"
+            )
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare row-by-row score recomputation with the set-based SQL path")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3000, 100000])
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.top, args.repeat)
@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+from scrapers.cdp_scraper import CDPScraper, ENVIRONMENTAL_SCORER
+from scrapers.fetcher import AsyncFetcher
+from scrapers.fixtures import SCRAPER_FIXTURES_DIR, Fixture, FixtureCorpus, RecordingTransport, ReplayTransport, synthetic_page
+from scrapers.glassdoor_scraper import GlassdoorScraper, WORKER_TREATMENT_SCORER
+from scrapers.http_cache import HttpCache
+from scrapers.opensecrets_scraper import OpenSecretsScraper, POLITICAL_SCORER
+from scrapers.pipeline import SCRAPER_FETCH_TASKS, SCRAPER_PROCESSES, SCRAPER_QUEUE_SIZE, ScrapePipeline
+from scrapers.propublica_scraper import ProPublicaScraper, PHILANTHROPY_SCORER, TAX_PRACTICE_SCORER
+from scrapers.sec_scraper import SECScraper, GOVERNANCE_SCORER
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRAPERS = {
+    'opensecrets': OpenSecretsScraper(),
+    'propublica': ProPublicaScraper(),
+    'cdp': CDPScraper(),
+    'sec': SECScraper(),
+    'glassdoor': GlassdoorScraper(),
+}
+
+KEYWORDS = sorted({
+    keyword
+    for scorer in (ENVIRONMENTAL_SCORER, WORKER_TREATMENT_SCORER, POLITICAL_SCORER,
+                   PHILANTHROPY_SCORER, TAX_PRACTICE_SCORER, GOVERNANCE_SCORER)
+    for keyword in scorer.weights
+})
+
+def synthetic_names(count: int) -> List[str]:
+    return [f"Synthetic Billionaire {index}" for index in range(count)]
+
+def synthetic_companies(count: int, per_company: int) -> List[str]:
+    """One company per billionaire, each shared by per_company billionaires in a row"""
+    return [f"Synthetic Company {index // per_company}" for index in range(count)]
+
+def seed_database(names: List[str], companies: List[str]):
+    """Create the schema in the scratch database and add the billionaires with their company links"""
+    from db_config import engine
+    from database import Database
+    from database_models import Base, BillionaireModel
+
+    Base.metadata.create_all(engine)
+    db = Database()
+    db.db.bulk_insert_mappings(BillionaireModel, [
+        {
+            'id': str(index),
+            'name': name,
+            'net_worth': 1000.0 - index,
+            'social_score': 0.0,
+            'environmental_score': 0.0,
+            'political_score': 0.0,
+            'philanthropy_score': 0.0,
+            'cultural_score': 0.0,
+            'overall_score': 0.0
+        } for index, name in enumerate(names)
+    ])
+    db.db.commit()
+    db.link_companies({str(index): [company] for index, company in enumerate(companies)})
+    db.close()
+
+def synthesize(corpus: FixtureCorpus, names: List[str], seed: int) -> int:
+    """Add a synthetic page for every URL the scrapers request for these names; returns how many were added"""
+    rng = random.Random(seed)
+    added = 0
+    for name in names:
+        for scraper in SCRAPERS.values():
+            for page, url in scraper.build_urls(name).items():
+                if url in corpus:
+                    continue
+                body = synthetic_page(f"{name} - {scraper.source} {page}", KEYWORDS, rng)
+                corpus.put(Fixture(url, 200, body, {"content-type": "text/html; charset=utf-8"}))
+                added += 1
+    return added
+
+async def record(corpus: FixtureCorpus, names: List[str]):
+    """Fetch the real pages for these names and save the responses in the corpus"""
+    async with AsyncFetcher(cache_enabled=False, transport=RecordingTransport(corpus)) as fetcher:
+        for scraper in SCRAPERS.values():
+            for name in names:
+                await scraper.fetch_pages(name, fetcher)
+                logger.info(f"Recorded {scraper.source} pages for {name}")
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def max_rss_mb(who: int) -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+async def refresh(
+    corpus: FixtureCorpus,
+    cache: HttpCache,
+    args: argparse.Namespace
+) -> Tuple[Dict[str, int], Dict[str, List[float]], int]:
+    """
+    One offline refresh of every billionaire in the scratch database through
+    ScraperManager, so company sharing and saving the results are measured
+    too. Returns the manager's summary, per-stage latencies and how many
+    company scrapes were shared.
+    """
+    from scrapers.scraper_manager import ScraperManager
+
+    stages: Dict[str, List[float]] = {"fetch": [], "extract": [], "persist": []}
+    hosts = {urlsplit(url).netloc for scraper in SCRAPERS.values() for url in scraper.build_urls("").values()}
+    transport = ReplayTransport(corpus, args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed)
+    manager = ScraperManager(
+        fetcher_factory=lambda: AsyncFetcher(
+            cache=cache,
+            cache_enabled=False,
+            # A rate of 0 keeps the real per-source limits
+            host_rates={host: args.rate for host in hosts} if args.rate else None,
+            transport=transport
+        ),
+        pipeline_factory=lambda fetcher: ScrapePipeline(
+            fetcher, args.processes, args.queue_size, args.fetch_tasks,
+            on_stage=lambda stage, seconds: stages[stage].append(seconds)
+        )
+    )
+    try:
+        async with manager:
+            summary = await manager.update_all_billionaires()
+    finally:
+        manager.db.close()
+    return summary, stages, manager.skipped["shared"]
+
+def run(args: argparse.Namespace):
+    corpus = FixtureCorpus(args.corpus)
+    names = synthetic_names(args.billionaires)
+    companies = synthetic_companies(args.billionaires, args.billionaires_per_company)
+    if args.record:
+        asyncio.run(record(corpus, args.record))
+        return
+    added = synthesize(corpus, names + sorted(set(companies)), args.seed)
+    logger.info(f"Corpus {args.corpus}: added {added} synthetic pages")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # The manager opens the database from the environment, so point it at a scratch file first
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(scratch, "benchmark.db")
+        seed_database(names, companies)
+        cache = HttpCache(os.path.join(scratch, "http_cache")) if args.cache else None
+        for run_number in range(1, args.passes + 1):
+            baseline = max_rss_mb(resource.RUSAGE_SELF)
+            started = time.perf_counter()
+            summary, stages, shared = asyncio.run(refresh(corpus, cache, args))
+            elapsed = time.perf_counter() - started
+            scrapes = len(stages["fetch"])
+            logger.info(
+                f"Pass {run_number}: {summary['updated']} billionaires updated, {summary['failed']} failed, "
+                f"in {elapsed:.2f}s, {len(names) / elapsed:.1f} billionaires/s; "
+                f"{scrapes} source scrapes ({scrapes / elapsed:.1f}/s), {shared} company scrapes shared"
+            )
+            for stage, latencies in stages.items():
+                # fetch and extract are timed per scrape, persist per saved batch
+                logger.info(
+                    f"  {stage:>7}: {len(latencies)} runs, p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+                    f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms"
+                )
+            logger.info(
+                f"  peak RSS {max_rss_mb(resource.RUSAGE_SELF):.0f} MiB (started at {baseline:.0f} MiB), "
+                f"largest worker process {max_rss_mb(resource.RUSAGE_CHILDREN):.0f} MiB"
+            )
+        if cache:
+            cache.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline offline against recorded or synthetic pages")
+    parser.add_argument("--billionaires", type=int, default=200, help="Synthetic billionaires to refresh")
+    parser.add_argument("--billionaires-per-company", type=int, default=3,
+                        help="Billionaires linked to each synthetic company; company-scoped scrapes are shared between them")
+    parser.add_argument("--corpus", default=SCRAPER_FIXTURES_DIR, help="Fixture directory")
+    parser.add_argument("--record", nargs="+", metavar="NAME", help="Record the live pages for these names instead of benchmarking")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Injected latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=100, help="Extra random latency per request, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503")
+    parser.add_argument("--rate", type=float, default=1000, help="Requests per second per host (0: the real source limits)")
+    parser.add_argument("--processes", type=int, default=SCRAPER_PROCESSES, help="Extract/score worker processes")
+    parser.add_argument("--queue-size", type=int, default=SCRAPER_QUEUE_SIZE)
+    parser.add_argument("--fetch-tasks", type=int, default=SCRAPER_FETCH_TASKS)
+    parser.add_argument("--cache", action="store_true", help="Go through a fresh on-disk HTTP cache")
+    parser.add_argument("--passes", type=int, default=1, help="Refreshes to run; with --cache, later passes hit the cache")
+    parser.add_argument("--seed", type=int, default=0)
+    run(parser.parse_args())
@@ -0,0 +1,255 @@
+"""
+Query-plan regression check for the hot queries.
+
+Seeds a scratch database, captures the SQL that the hot code paths
+actually emit (the Database methods on the request and refresh paths,
+job claims and the refresh scheduler), runs EXPLAIN on each statement and
+exits non-zero if any plan falls back to a full table scan (or to a sort
+where an index should provide the order).
+
+    python scripts/check_query_plans.py                       # temporary SQLite file
+    python scripts/check_query_plans.py --url postgresql://... # scratch Postgres database
+
+The target database is seeded with synthetic rows, so never point --url
+at real data.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ['social', 'environmental', 'political', 'philanthropy', 'cultural']
+
+def seed(session, billionaires: int, votes: int, reports: int):
+    from database import Database
+    from database_models import BillionaireModel, VoteModel, ReportModel
+    from job_queue import JobQueue
+
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    session.bulk_insert_mappings(BillionaireModel, [
+        {
+            'id': str(i),
+            'name': f"Billionaire {i}",
+            'net_worth': rng.uniform(1, 300),
+            'social_score': rng.uniform(0, 30),
+            'environmental_score': rng.uniform(0, 20),
+            'political_score': rng.uniform(0, 20),
+            'philanthropy_score': rng.uniform(0, 20),
+            'cultural_score': rng.uniform(0, 10),
+            'overall_score': 0.0
+        } for i in range(billionaires)
+    ])
+    # Each user holds at most one vote per category
+    voters = [(f"user{i // len(CATEGORIES)}", CATEGORIES[i % len(CATEGORIES)]) for i in range(votes)]
+    session.bulk_insert_mappings(VoteModel, [
+        {
+            'user_id': user_id,
+            'category': category,
+            'weight': rng.random(),
+            'timestamp': now - timedelta(minutes=rng.randrange(60 * 24 * 365))
+        } for user_id, category in voters
+    ])
+    session.bulk_insert_mappings(ReportModel, [
+        {
+            'user_id': f"user{rng.randrange(100)}",
+            'billionaire_id': str(rng.randrange(billionaires)),
+            'evidence': "synthetic",
+            'category': rng.choice(CATEGORIES),
+            'timestamp': now - timedelta(minutes=rng.randrange(60 * 24 * 365)),
+            'status': rng.choice(["pending"] * 9 + ["verified"])
+        } for _ in range(reports)
+    ])
+    session.commit()
+
+    # Companies shared by a few billionaires each, the latest scrapes, and a refresh that has
+    # finished, with a tenth of the billionaires queued again
+    db = Database(session)
+    db.link_companies({str(i): [f"Company {i // 3}"] for i in range(billionaires)})
+    db.save_scrape_results([
+        (str(i), source, now - timedelta(hours=rng.randrange(24 * 30)), {"score": rng.random()}, None, "b", "t")
+        for i in range(billionaires) for source in ("opensecrets", "propublica")
+    ])
+    db.save_company_scrape_results([
+        (f"company-{i}", source, now - timedelta(hours=rng.randrange(24 * 30)), {"score": rng.random()}, None, "b", "t")
+        for i in range(billionaires // 3 + 1) for source in ("cdp", "sec", "glassdoor")
+    ])
+    queue = JobQueue(session)
+    queue.enqueue()
+    while True:
+        token, leased = queue.claim(1000)
+        if not leased:
+            break
+        queue.complete(token, leased)
+    queue.schedule({str(i): float(i) for i in range(0, billionaires, 10)})
+
+class StatementRecorder:
+    """Collects the SELECT statements executed on an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.statements = []
+        self.recording = False
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording and statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    def capture(self, fn):
+        self.statements = []
+        self.recording = True
+        try:
+            fn()
+        finally:
+            self.recording = False
+        return self.statements
+
+def hot_queries(db):
+    """
+    (name, callable, scan_ok) for every query the check covers; each callable
+    goes through the code path that issues the query in production.
+    scan_ok marks queries that legitimately read a whole (small or
+    PK-ordered) table, or walk an index from its start under a LIMIT,
+    where a scan is the intended plan. Every other query must seek.
+    """
+    from job_queue import JobQueue
+    from models import Vote
+    from refresh_scheduler import RefreshScheduler
+    from scrapers.scraper_manager import ScraperManager
+
+    first_page = db.get_rankings_page(50)
+    cursor = (first_page[-1].overall_score, first_page[-1].id)
+    ids = [str(i) for i in range(40, 60)]
+    company_ids = sorted({key for links in db.get_billionaire_companies(ids).values() for key, _ in links})
+    since = datetime.utcnow() - timedelta(days=1)
+    # The scheduler only needs the manager's scrapers, not its session
+    manager = ScraperManager()
+    manager.db.close()
+    scheduler = RefreshScheduler(db.db, manager.scrapers)
+
+    return [
+        ("rankings first page", lambda: db.get_rankings_page(51), True),
+        ("rankings keyset page", lambda: db.get_rankings_page(51, cursor), False),
+        ("ranked top-N", lambda: db.get_ranked_billionaires(50), True),
+        ("rank of billionaire", lambda: db.get_rank("42"), False),
+        ("billionaire by id", lambda: db.get_billionaire("42"), False),
+        ("billionaires by id", lambda: db.get_billionaires_by_id(ids), False),
+        ("billionaires after", lambda: db.get_billionaires_after("42", 500), False),
+        ("ranking version", lambda: db.get_ranking_version(), False),
+        ("vote aggregates", lambda: db.get_vote_aggregates("all"), True),
+        ("windowed vote aggregates", lambda: db.get_vote_aggregates("window"), False),
+        ("vote aggregate rebuild", lambda: db.rebuild_vote_aggregates(), True),
+        ("vote batch", lambda: db.save_votes([
+            Vote(user_id="user7", category="social", weight=0.5),
+            Vote(user_id="user8", category="cultural", weight=0.5)
+        ]), False),
+        ("job claim", lambda: JobQueue(db.db).claim(20), False),
+        # Ranks every billionaire by net worth in one index walk; the per-row lookups must seek
+        ("refresh candidates", lambda: list(scheduler.candidates(datetime.utcnow())), True),
+        ("company links", lambda: db.get_billionaire_companies(ids), False),
+        ("scrape fingerprints", lambda: db.get_scrape_fingerprints(ids), False),
+        ("company scrape fingerprints", lambda: db.get_company_scrape_fingerprints(company_ids), False),
+        ("company scores since", lambda: db.get_company_scores_since(company_ids, since), False),
+    ]
+
+def sqlite_problems(connection, statement, parameters, scan_ok):
+    cursor = connection.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+    details = [row[-1] for row in cursor.fetchall()]
+    problems = []
+    for detail in details:
+        # Includes SCAN ... USING INDEX: walking an index from the top is still O(table)
+        if detail.startswith("SCAN") and not scan_ok:
+            problems.append(detail)
+        if "USE TEMP B-TREE FOR ORDER BY" in detail:
+            problems.append(detail)
+    return details, problems
+
+def postgres_problems(connection, statement, parameters, scan_ok):
+    cursor = connection.cursor()
+    cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    details, problems = [], []
+    def walk(node):
+        label = f"{node['Node Type']} {node.get('Relation Name', '')}".strip()
+        details.append(label)
+        if node['Node Type'] == "Seq Scan" and not scan_ok:
+            problems.append(label)
+        # An index scan without an index condition walks the whole index, filtering as it goes
+        if node['Node Type'] in ("Index Scan", "Index Only Scan") and 'Index Cond' not in node and not scan_ok:
+            problems.append(label)
+        # An explicit sort means the ORDER BY is no longer served by an index
+        if node['Node Type'] == "Sort" and "ORDER BY" in statement.upper():
+            problems.append(label)
+        for child in node.get('Plans', []):
+            walk(child)
+    walk(plan[0]['Plan'])
+    return details, problems
+
+def check(url: str, billionaires: int, votes: int, reports: int) -> bool:
+    os.environ.setdefault("DATABASE_URL", url)
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+    from database_models import Base
+    from database import Database
+    from utils import calculate_weights
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    db = Database(session)
+
+    logger.info(f"Seeding {billionaires} billionaires, {votes} votes and {reports} reports")
+    seed(session, billionaires, votes, reports)
+    db.rebuild_vote_aggregates()
+    db.update_billionaire_scores(calculate_weights(db))
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+    recorder = StatementRecorder(engine)
+    explain = sqlite_problems if engine.dialect.name == "sqlite" else postgres_problems
+    ok = True
+    for name, query, scan_ok in hot_queries(db):
+        statements = recorder.capture(query)
+        session.rollback()
+        raw = engine.raw_connection()
+        try:
+            for statement, parameters in statements:
+                details, problems = explain(raw, statement, parameters, scan_ok)
+                if problems:
+                    ok = False
+                    logger.error(f"{name}: plan regressed ({'; '.join(problems)})\n  {statement}")
+                else:
+                    logger.info(f"{name}: {'; '.join(details)}")
+        finally:
+            raw.close()
+
+    db.close()
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a hot query's plan regresses to a full scan")
+    parser.add_argument("--url", help="Scratch database URL (defaults to a temporary SQLite file)")
+    parser.add_argument("--billionaires", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=50000)
+    parser.add_argument("--reports", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.url is not None:
+        sys.exit(0 if check(args.url, args.billionaires, args.votes, args.reports) else 1)
+    with tempfile.TemporaryDirectory() as scratch:
+        ok = check(f"sqlite:///{os.path.join(scratch, 'plans.db')}", args.billionaires, args.votes, args.reports)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,39 @@
+import argparse
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from database import Database
+from database_models import BillionaireModel
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def import_companies(path: str):
+    """Link the billionaires already in the database to the companies the JSON file lists for them, matching by name"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    listed = {b['name']: b.get('companies', []) for b in data['billionaires']}
+
+    db = Database()
+    try:
+        billionaires = db.db.query(BillionaireModel.id, BillionaireModel.name).filter(
+            BillionaireModel.name.in_(list(listed))
+        ).all()
+        companies = {billionaire_id: listed[name] for billionaire_id, name in billionaires}
+        missing = set(listed) - {name for _, name in billionaires}
+        if missing:
+            logger.warning(f"{len(missing)} billionaires are not in the database: {', '.join(sorted(missing))}")
+        links = db.link_companies(companies)
+        distinct = len({name for names in companies.values() for name in names})
+        logger.info(f"Linked {len(companies)} billionaires to {distinct} companies ({links} links)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import billionaires' companies so company-level sources are scraped once per company")
+    parser.add_argument("--file", default="attached_assets/billionaires-json.json", help="JSON file with a companies list per billionaire")
+    import_companies(parser.parse_args().file)
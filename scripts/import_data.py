@@ -5,7 +5,8 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
 
 from database import Database
-from database_models import BillionaireModel
+from database_models import BillionaireCompanyModel, BillionaireModel, BillionaireRankingModel, ScrapeJobModel, ScrapeResultModel
+from utils import calculate_weights
 import logging
 
 # Setup logging
@@ -31,9 +32,11 @@ def fetch_and_import_data():
         logger.error(f"Failed to connect to database: {e}")
         return
 
-    # Clean existing data
+    # Clean existing data. IDs are reassigned by rank, so rows that reference a
+    # billionaire are removed with them, first and in the same transaction
     try:
-        db.db.query(BillionaireModel).delete()
+        for model in (BillionaireRankingModel, ScrapeResultModel, ScrapeJobModel, BillionaireCompanyModel, BillionaireModel):
+            db.db.query(model).delete()
         db.db.commit()
         logger.info("Cleaned existing data")
     except Exception as e:
@@ -105,6 +108,16 @@ def fetch_and_import_data():
             logger.error(f"Error committing final batch: {e}")
             db.db.rollback()
 
+    # Category scores changed, so publish a fresh ranking snapshot
+    try:
+        version = db.update_billionaire_scores(calculate_weights(db))
+        logger.info(f"Published ranking snapshot version {version}")
+    except Exception as e:
+        logger.error(f"Error recomputing overall scores: {e}")
+        db.db.rollback()
+    finally:
+        db.close()
+
 if __name__ == "__main__":
     try:
         fetch_and_import_data()
@@ -0,0 +1,30 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from database import Database
+from utils import calculate_weights
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def rebuild_vote_aggregates():
+    """Rebuild the vote_aggregates table from the raw votes and re-rank with the rebuilt weights"""
+    db = Database()
+    try:
+        db.rebuild_vote_aggregates()
+        for category, aggregate in sorted(db.get_vote_aggregates().items()):
+            logger.info(f"{category}: {aggregate['count']} votes, sum {aggregate['sum']:.3f}")
+        # Weights derived from the rebuilt aggregates can differ, so publish them like a vote batch does
+        version = db.refresh_ranking_snapshot(calculate_weights(db))
+        logger.info(f"Ranking snapshot version {version}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    try:
+        rebuild_vote_aggregates()
+    except Exception as e:
+        logger.exception("Unexpected error while rebuilding vote aggregates")
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from db_config import SessionLocal
+from refresh_scheduler import RefreshScheduler, SCHEDULER_SOURCE_BUDGETS, SCHEDULER_TICK_SECONDS, parse_budgets
+from scrapers.scraper_manager import ScraperManager
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def run_scheduler(tick_seconds: float, ticks: int = 0):
+    """
+    Keep the job queue topped up with the billionaires most in need of a
+    refresh; scripts/run_workers.py --forever does the scraping. ticks=0 runs
+    until interrupted.
+    """
+    manager = ScraperManager()
+    session = SessionLocal()
+    try:
+        scheduler = RefreshScheduler(session, manager.scrapers, parse_budgets(SCHEDULER_SOURCE_BUDGETS), tick_seconds)
+        for source, rate in scheduler.rates.items():
+            scope = "company" if source in scheduler.company_scoped else "billionaire"
+            logger.info(f"{source}: {rate * 3600:.0f} requests/hour, {scheduler.pages[source]} per {scope}")
+        tick = 0
+        while not ticks or tick < ticks:
+            started = time.monotonic()
+            try:
+                scheduler.tick()
+            except Exception:
+                session.rollback()
+                logger.exception("Scheduling refreshes failed")
+            tick += 1
+            time.sleep(max(0.0, tick_seconds - (time.monotonic() - started)))
+    finally:
+        session.close()
+        manager.db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Schedule billionaire refreshes by staleness and importance")
+    parser.add_argument("--tick-seconds", type=float, default=SCHEDULER_TICK_SECONDS)
+    parser.add_argument("--ticks", type=int, default=0, help="Stop after this many ticks (default: run forever)")
+    args = parser.parse_args()
+    try:
+        run_scheduler(args.tick_seconds, args.ticks)
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped")
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # Add project root to Python path
+
+from typing import Dict, List
+from db_config import SessionLocal
+from job_queue import JobQueue
+from scrapers.scraper_manager import ScraperManager
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Billionaires a worker claims at a time; one batch must finish within the visibility timeout
+JOB_BATCH_SIZE = int(os.environ.get("JOB_BATCH_SIZE", "20"))
+# Pause before asking an empty queue again
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "5"))
+
+def job_errors(results: List[dict]) -> Dict[str, str]:
+    """Error message per billionaire whose update failed"""
+    errors = {}
+    for result in results:
+        error = result.get("error") or result["result"].get("error")
+        if error:
+            errors[result["billionaire_id"]] = error
+    return errors
+
+async def work(name: str, batch_size: int, forever: bool):
+    """Claim and run jobs until the queue is drained (or, with forever, indefinitely)"""
+    manager = ScraperManager()
+    # The manager's session, since an embedded SQLite primary allows one write connection per process
+    queue = JobQueue(manager.db.db)
+    done = failed = 0
+    try:
+        # One fetcher and pipeline for the worker's lifetime, so host throttles, connections
+        # and extract processes carry over between batches
+        async with manager:
+            while True:
+                token, ids = await asyncio.to_thread(queue.claim, batch_size)
+                if not ids:
+                    # Jobs waiting out a retry delay still count as pending
+                    if not forever and await asyncio.to_thread(queue.pending) == 0:
+                        break
+                    await asyncio.sleep(JOB_POLL_SECONDS)
+                    continue
+
+                billionaires = await asyncio.to_thread(manager.db.get_billionaires_by_id, ids)
+                results = await manager.update_billionaires(billionaires)
+                errors = job_errors(results)
+                # Billionaires deleted since they were queued have nothing left to do
+                score_changes = {result["billionaire_id"]: result["score_change"] for result in results if "score_change" in result}
+                await asyncio.to_thread(
+                    queue.complete, token, [billionaire_id for billionaire_id in ids if billionaire_id not in errors], score_changes
+                )
+                if errors:
+                    await asyncio.to_thread(queue.fail, token, errors)
+                done += len(ids) - len(errors)
+                failed += len(errors)
+                logger.info(f"{name}: {done} jobs done, {failed} failed attempts")
+    finally:
+        manager.db.close()
+
+def run_worker(name: str, batch_size: int, forever: bool):
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(work(name, batch_size, forever))
+
+def run_workers(workers: int, batch_size: int, enqueue: bool, forever: bool):
+    session = SessionLocal()
+    try:
+        queue = JobQueue(session)
+        if enqueue:
+            logger.info(f"Queued {queue.enqueue()} jobs")
+        logger.info(f"Jobs by status: {queue.counts()}")
+    finally:
+        session.close()
+
+    # Workers share the cores between their extract/score pools unless told otherwise
+    os.environ.setdefault("SCRAPER_PROCESSES", str(max(1, (os.cpu_count() or 1) // workers)))
+    # and the per-host request rates, which each worker enforces on its own
+    os.environ.setdefault("SCRAPER_RATE_SHARES", str(workers))
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(f"worker-{index}", batch_size, forever), name=f"worker-{index}")
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    session = SessionLocal()
+    try:
+        logger.info(f"Jobs by status: {JobQueue(session).counts()}")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scrape workers against the durable job queue")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--batch-size", type=int, default=JOB_BATCH_SIZE, help="Jobs claimed at a time per worker")
+    parser.add_argument("--enqueue", action="store_true", help="Queue a job for every billionaire first")
+    parser.add_argument("--forever", action="store_true", help="Keep polling once the queue is drained")
+    args = parser.parse_args()
+    run_workers(args.workers, args.batch_size, args.enqueue, args.forever)
@@ -1,8 +1,6 @@
 import json
 import os
 import uuid
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 import sys
 from pathlib import Path
 import logging
@@ -11,6 +9,9 @@ import logging
 sys.path.append(str(Path(__file__).parent.parent))
 
 from database_models import Base, BillionaireModel
+from database import Database
+from db_config import SessionLocal
+from utils import calculate_weights
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,20 +28,16 @@ def clean_net_worth(net_worth_str):
 def update_billionaires():
     """Update billionaire data from JSON file"""
     try:
-        # Get database URL from environment
-        database_url = os.environ.get('DATABASE_URL')
-        if not database_url:
-            raise ValueError("DATABASE_URL environment variable not set")
-
-        # Create database engine and session
-        engine = create_engine(database_url)
-        Session = sessionmaker(bind=engine)
-        session = Session()
+        # Session on the configured backend (Postgres or embedded SQLite)
+        session = SessionLocal()
 
         logger.info("Reading billionaire data from JSON file...")
         with open('attached_assets/billionaires-json.json', 'r') as f:
             data = json.load(f)
 
+        # Company names of each added billionaire, linked once the billionaires are committed
+        companies = {}
+
         # Process each billionaire
         for billionaire_data in data['billionaires']:
             try:
@@ -61,6 +58,7 @@ def update_billionaires():
                     overall_score=0.0  # Will be calculated by the model
                 )
                 session.add(billionaire)
+                companies[billionaire.id] = billionaire_data.get('companies', [])
                 logger.info(f"Added billionaire: {name} with net worth: ${net_worth}B")
 
             except Exception as e:
@@ -73,6 +71,16 @@ def update_billionaires():
         session.commit()
         logger.info("Successfully updated billionaire data")
 
+        # Category scores changed, so publish a fresh ranking snapshot
+        db = Database()
+        try:
+            links = db.link_companies(companies)
+            logger.info(f"Linked {len(companies)} billionaires to their companies ({links} links)")
+            version = db.update_billionaire_scores(calculate_weights(db))
+            logger.info(f"Published ranking snapshot version {version}")
+        finally:
+            db.close()
+
     except Exception as e:
         logger.error(f"Failed to update billionaires: {str(e)}")
         raise
@@ -1,31 +1,28 @@
-from typing import Dict
+from typing import Dict, Optional, Tuple
+import base64
+import binascii
+import json
 from database import Database
+from scoring import DEFAULT_WEIGHTS
 
 def calculate_weights(db: Database) -> Dict[str, float]:
     """Calculate current weights based on user votes"""
-    votes = db.get_votes()
+    aggregates = db.get_vote_aggregates()
 
     # Default weights
-    weights = {
-        'social': 0.3,
-        'environmental': 0.2,
-        'political': 0.2,
-        'philanthropy': 0.2,
-        'cultural': 0.1
-    }
-
-    if not votes:
+    weights = dict(DEFAULT_WEIGHTS)
+
+    if not aggregates:
         return weights
 
-    # Calculate average weights from votes
+    # Per-category sums and counts are maintained incrementally by Database.save_votes
     vote_sums = {category: 0.0 for category in weights.keys()}
     vote_counts = {category: 0 for category in weights.keys()}
 
-    for vote in votes:
-        category = vote['category']
+    for category, aggregate in aggregates.items():
         if category in vote_sums:
-            vote_sums[category] += vote['weight']
-            vote_counts[category] += 1
+            vote_sums[category] = aggregate['sum']
+            vote_counts[category] = aggregate['count']
 
     # Calculate normalized weights
     total_weight = 0
@@ -39,4 +36,18 @@ def calculate_weights(db: Database) -> Dict[str, float]:
         for category in weights.keys():
             weights[category] = weights[category] / total_weight
 
-    return weights
\ No newline at end of file
+    return weights
+
+def encode_cursor(overall_score: float, billionaire_id: str) -> str:
+    """Opaque next-page token pointing just past the given ranking row"""
+    payload = json.dumps([overall_score, billionaire_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Optional[Tuple[float, str]]:
+    """Inverse of encode_cursor; returns None for a malformed token"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        overall_score, billionaire_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(overall_score), str(billionaire_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
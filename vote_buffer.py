@@ -0,0 +1,119 @@
+from typing import Awaitable, Callable, List, Optional
+from models import Vote
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# A batch is written once this many votes are pending...
+VOTE_BATCH_SIZE = int(os.environ.get("VOTE_BATCH_SIZE", "500"))
+# ...or once the oldest pending vote has waited this long
+VOTE_FLUSH_INTERVAL_MS = int(os.environ.get("VOTE_FLUSH_INTERVAL_MS", "50"))
+# Beyond this many pending votes, submitters wait for a flush (backpressure)
+VOTE_BUFFER_MAX = int(os.environ.get("VOTE_BUFFER_MAX", "10000"))
+# Pause before retrying a batch whose write failed
+VOTE_RETRY_SECONDS = 1.0
+
+class VoteBuffer:
+    """
+    Write-behind buffer for votes. add() returns as soon as the vote is
+    queued; a background task hands the queue to the writer in batches,
+    so one commit (and one aggregate update per category) covers many
+    votes. close() writes whatever is still pending.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Vote]], Awaitable[None]],
+        batch_size: int = VOTE_BATCH_SIZE,
+        flush_interval_ms: int = VOTE_FLUSH_INTERVAL_MS,
+        max_pending: int = VOTE_BUFFER_MAX
+    ):
+        self._writer = writer
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._max_pending = max_pending
+        self._pending: List[Vote] = []
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, vote: Vote):
+        if self._closed:
+            raise RuntimeError("Vote buffer is closed")
+        self.start()
+        while len(self._pending) >= self._max_pending:
+            self._drained.clear()
+            await self._drained.wait()
+        self._pending.append(vote)
+        self._arrived.set()
+        if len(self._pending) >= self._batch_size:
+            self._full.set()
+
+    async def flush(self):
+        """Write every pending vote now"""
+        while self._pending:
+            await self._flush_batch(retry=False)
+
+    async def close(self):
+        """Stop the background task and write the remaining votes"""
+        self._closed = True
+        if self._task is not None:
+            # Wake the task so it finishes any batch in flight and exits
+            self._arrived.set()
+            self._full.set()
+            await self._task
+        if self._pending:
+            logger.info(f"Flushing {len(self._pending)} buffered votes before shutdown")
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(f"Could not write {len(self._pending)} buffered votes on shutdown")
+            raise
+
+    async def _run(self):
+        while not self._closed:
+            if not self._pending:
+                self._arrived.clear()
+                await self._arrived.wait()
+                if self._closed:
+                    break
+            # A batch is forming; give it until the interval elapses or it fills up
+            if len(self._pending) < self._batch_size:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self._flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_batch(retry=True)
+
+    async def _flush_batch(self, retry: bool):
+        async with self._flush_lock:
+            batch = self._pending[:self._batch_size]
+            if not batch:
+                return
+            del self._pending[:len(batch)]
+            try:
+                await self._writer(batch)
+            except Exception:
+                # Put the batch back in front so vote order is kept for the retry
+                self._pending[:0] = batch
+                if not retry:
+                    raise
+                logger.exception(f"Writing {len(batch)} votes failed, retrying in {VOTE_RETRY_SECONDS}s")
+                await asyncio.sleep(VOTE_RETRY_SECONDS)
+                return
+            finally:
+                if len(self._pending) < self._max_pending:
+                    self._drained.set()
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+import os
+
+# How votes are averaged into category weights:
+#   "all"    - every vote counts equally (default)
+#   "decay"  - exponential decay with a half-life of VOTE_HALF_LIFE_DAYS
+#   "window" - only votes from the last VOTE_WINDOW_DAYS count
+VOTE_WEIGHTING = os.environ.get("VOTE_WEIGHTING", "all").lower()
+VOTE_HALF_LIFE_DAYS = float(os.environ.get("VOTE_HALF_LIFE_DAYS", "30"))
+VOTE_WINDOW_DAYS = float(os.environ.get("VOTE_WINDOW_DAYS", "30"))
+# Granularity of the window's partial aggregates; the window edge moves in these steps
+VOTE_BUCKET_MINUTES = int(os.environ.get("VOTE_BUCKET_MINUTES", "60"))
+
+if VOTE_WEIGHTING not in ("all", "decay", "window"):
+    raise ValueError(f"Unknown VOTE_WEIGHTING: {VOTE_WEIGHTING}")
+
+# Rebase the decayed sums once their scale factor reaches 2**DECAY_REBASE_HALF_LIVES,
+# long before a float could overflow (2**1024)
+DECAY_REBASE_HALF_LIVES = 64
+
+BUCKET_ORIGIN = datetime(1970, 1, 1)
+
+def decay_factor(timestamp: datetime, epoch: datetime, half_life_days: float = VOTE_HALF_LIFE_DAYS) -> float:
+    """
+    Scale of a vote cast at timestamp, relative to the epoch. Decayed sums
+    store every vote multiplied by its factor, so a vote's weight relative to
+    newer votes halves every half-life while the stored values never change;
+    the common decay at read time cancels out of sum / count.
+    """
+    return 2.0 ** ((timestamp - epoch) / timedelta(days=half_life_days))
+
+def needs_rebase(now: datetime, epoch: datetime, half_life_days: float = VOTE_HALF_LIFE_DAYS) -> bool:
+    return (now - epoch) / timedelta(days=half_life_days) >= DECAY_REBASE_HALF_LIVES
+
+def bucket_start(timestamp: datetime, minutes: int = VOTE_BUCKET_MINUTES) -> datetime:
+    """Start of the window bucket a vote falls into"""
+    size = timedelta(minutes=minutes)
+    return BUCKET_ORIGIN + ((timestamp - BUCKET_ORIGIN) // size) * size
+
+def window_start(now: datetime, days: float = VOTE_WINDOW_DAYS) -> datetime:
+    """Oldest bucket still inside the window ending at now"""
+    return bucket_start(now - timedelta(days=days))